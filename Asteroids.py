@@ -1,6 +1,14 @@
 import pygame
 import random
 
+import numpy as np
+
+from game_loop import FixedStepLoop, lerp, scale_steps, step_scale
+from entity_store import COLOR, POSITION, SIZE, VELOCITY, EntityStore
+from headless import LiveInput, ScriptedInput, use_dummy_drivers
+from profiler import FrameProfiler
+from text_cache import TextCache
+
 # Game Configuration
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -8,39 +16,81 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 FPS = 60
+# Above this fraction of the screen a dirty-rect update costs more than a flip
+DIRTY_AREA_LIMIT = 0.4
+# Asteroid size and speed ranges (inclusive), shared with the batch environment
+ASTEROID_SIZE = (30, 70)
+ASTEROID_SPEED = (3, 8)
+# Asteroid columns: the moving parts plus where each is drawn now and was last drawn
+ASTEROID_COMPONENTS = POSITION + VELOCITY + SIZE + COLOR + (
+    ('draw_y', np.int32), ('drawn_y', np.int32), ('drawn', np.bool_))
 
 class Game:
     """
     Main game class that manages the game loop, screen, and overall game state.
     This is the central controller of the game.
     """
-    def __init__(self):
-        """Initialize pygame, create the screen, and set up game objects"""
+    def __init__(self, headless=False, input_source=None, dirty_rects=True, step_rate=FPS, render_rate=FPS):
+        """
+        Initialize pygame, create the screen, and set up game objects.
+        In headless mode no window is shown, nothing is drawn and input
+        comes from input_source (an idle script by default).
+        With dirty_rects only the regions that changed are redrawn and
+        pushed to the display each frame.
+        The simulation steps step_rate times a second and frames are drawn
+        up to render_rate times; speeds, timers and the score are tuned per
+        FPS step and scaled to the step rate.
+        """
+        self.headless = headless
+        self.dirty_rects = dirty_rects
+        self.step_scale = step_scale(step_rate, FPS)
+        if headless:
+            use_dummy_drivers()
+            self.input = input_source or ScriptedInput(fps=step_rate)
+        else:
+            self.input = input_source or LiveInput(step_rate)
+        
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Asteroid Dodger")
         
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
+        self.profiler = FrameProfiler()
+        self.loop = FixedStepLoop(step_rate, render_rate, profiler=self.profiler)
+        self.text = TextCache()
+        self.font = self.text.font(36)
+        self.overlay_font = self.text.font(20)
         
         # Create game objects
-        self.player = Player()
-        self.asteroid_manager = AsteroidManager()
+        self.player = Player(self.step_scale)
+        self.asteroid_manager = AsteroidManager(self.step_scale)
         
         # Game state variables
+        self.running = True
         self.score = 0
         self.game_over = False
         
+        # Dirty-rect rendering state
+        self.full_redraw = True
+        self.score_rect = None
+        self.presented_area = 0
+        
     def handle_events(self):
         """Handle pygame events like quitting and key presses"""
-        for event in pygame.event.get():
+        events = [] if self.headless else pygame.event.get()
+        self.input.advance(events)
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
+            self.profiler.handle_event(event)
             
-            # Add any additional event handling here
-            if event.type == pygame.KEYDOWN:
-                if self.game_over and event.key == pygame.K_r:
-                    self.reset_game()
+            # The window contents were lost, so repaint everything
+            if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.full_redraw = True
+        
+        # Add any additional key handling here
+        for key in self.input.key_downs:
+            if self.game_over and key == pygame.K_r:
+                self.reset_game()
         
         return True
     
@@ -48,66 +98,158 @@ class Game:
         """Update game logic each frame"""
         if not self.game_over:
             # Update player movement
-            self.player.update()
+            self.player.update(self.input.get_pressed())
             
             # Update asteroids
-            self.asteroid_manager.update()
+            with self.profiler.section('AsteroidManager.update'):
+                self.asteroid_manager.update()
             
-            # Check for collisions
-            for asteroid in self.asteroid_manager.asteroids:
-                if self.player.check_collision(asteroid):
-                    self.game_over = True
+            # Check for collisions against all of them at once
+            if self.asteroid_manager.collides(self.player.rect):
+                self.game_over = True
+                # Nothing moves on the game over screen, so collect garbage now
+                self.loop.collect_garbage()
             
-            # Increment score
-            self.score += 1
+            # Score the time survived, one point per FPS step
+            self.score += self.step_scale
     
-    def draw(self):
-        """Draw all game objects"""
-        # Clear the screen
+    def draw(self, alpha=1.0):
+        """
+        Draw all game objects, alpha of the way from their previous to
+        their current simulated position
+        """
+        if self.game_over:
+            # The game over screen is static, so it is only drawn once
+            if self.full_redraw or self.score_rect:
+                self.draw_game_over()
+            else:
+                self.presented_area = 0
+            return
+        
+        self.player.place(alpha)
+        self.asteroid_manager.place(alpha)
+        
+        # The profiler overlay is debug-only, so it simply turns dirty rects off
+        if self.full_redraw or not self.dirty_rects or self.profiler.show_overlay:
+            self.draw_full()
+            return
+        
+        # Many small updates cost more than one flip once enough has changed
+        dirty = self.dirty_regions()
+        area = sum(rect.width * rect.height for rect in dirty)
+        if area > SCREEN_WIDTH * SCREEN_HEIGHT * DIRTY_AREA_LIMIT:
+            self.draw_full()
+            return
+        
+        # Erase every changed region, then redraw everything on top
+        for rect in dirty:
+            self.screen.fill(BLACK, rect)
+        self.player.draw(self.screen)
+        self.asteroid_manager.draw(self.screen)
+        self.score_rect = self.draw_score()
+        self.present(dirty)
+        self.presented_area = area
+    
+    def draw_full(self):
+        """Clear the screen, draw everything and flip"""
         self.screen.fill(BLACK)
         
-        if not self.game_over:
-            # Draw player
-            self.player.draw(self.screen)
-            
-            # Draw asteroids
-            self.asteroid_manager.draw(self.screen)
-            
-            # Draw score
-            score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
-        else:
-            # Game over screen
-            game_over_text = self.font.render("Game Over!", True, RED)
-            restart_text = self.font.render("Press R to Restart", True, WHITE)
-            self.screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
-            self.screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT//2 + 50))
+        # Draw player
+        self.player.draw(self.screen)
+        
+        # Draw asteroids
+        self.asteroid_manager.draw(self.screen)
+        self.asteroid_manager.removed.clear()
+        
+        # Draw score
+        self.score_rect = self.draw_score()
+        self.profiler.draw_overlay(self.screen, self.text, self.overlay_font)
         
         # Update the display
-        pygame.display.flip()
+        self.present()
+        self.presented_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        self.full_redraw = False
+    
+    def dirty_regions(self):
+        """
+        Return the regions that change this frame: for each object the union
+        of where it was last drawn and where it is now, the last bounds of
+        removed asteroids, and the score.
+        """
+        manager = self.asteroid_manager
+        dirty = manager.removed
+        manager.removed = []
+        manager.dirty_regions(dirty)
+        dirty.append(self.player.draw_rect.union(self.player.drawn))
+        dirty.append(self.text.number_rect(self.font, "Score: ", self.score, WHITE, (10, 10)).union(self.score_rect))
+        return dirty
+    
+    def draw_score(self):
+        """Draw the score and return its bounds"""
+        return self.text.draw_number(self.screen, self.font, "Score: ", self.score, WHITE, (10, 10))
+    
+    def draw_game_over(self):
+        """Draw the game over screen"""
+        self.screen.fill(BLACK)
+        game_over_text = self.text.render(self.font, "Game Over!", RED)
+        restart_text = self.text.render(self.font, "Press R to Restart", WHITE)
+        self.screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
+        self.screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT//2 + 50))
+        self.present()
+        self.presented_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        
+        # Nothing from the play screen is left to erase
+        self.score_rect = None
+        self.full_redraw = False
+    
+    def present(self, rects=None):
+        """Push the given regions, or the whole screen, to the display"""
+        with self.profiler.section('display.flip'):
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
     
     def reset_game(self):
         """Reset the game to its initial state"""
-        self.player = Player()
-        self.asteroid_manager = AsteroidManager()
+        self.player = Player(self.step_scale)
+        self.asteroid_manager = AsteroidManager(self.step_scale)
         self.score = 0
         self.game_over = False
+        self.full_redraw = True
     
-    def run(self):
-        """Main game loop"""
-        running = True
-        while running:
-            # Handle events
-            running = self.handle_events()
-            
-            # Update game state
+    def step(self):
+        """Advance the simulation by one fixed step"""
+        # Handle events
+        with self.profiler.section('handle_events'):
+            self.running = self.handle_events()
+        
+        # Update game state
+        with self.profiler.section('update'):
             self.update()
-            
-            # Draw everything
-            self.draw()
-            
-            # Control game speed
-            self.clock.tick(FPS)
+        if self.profiler.show_overlay:
+            self.profiler.note('asteroids', self.asteroid_manager.asteroids.describe())
+    
+    def is_running(self):
+        """
+        Check whether the main loop should keep going. Headless runs with
+        endless input (the idle script by default) end at game over, as
+        Shooter's do, instead of idling on forever; a scripted sequence
+        such as a replay, which may restart, plays out to its end.
+        """
+        if self.headless and self.game_over and self.input.endless:
+            return False
+        return self.running and not self.input.finished
+    
+    def run(self, max_frames=None):
+        """
+        Main game loop.
+        Stops on quit, after max_frames frames, or when a scripted input
+        runs out. The simulation steps at a fixed FPS whatever the render
+        cost; headless runs skip drawing and step as fast as possible.
+        """
+        self.running = True
+        self.loop.run(self.step, self.draw, self.is_running, max_frames, self.headless)
         
         # Quit the game
         pygame.quit()
@@ -117,18 +259,22 @@ class Player:
     Player class representing the controllable character.
     Manages player movement, drawing, and collision detection.
     """
-    def __init__(self):
-        """Initialize player attributes"""
+    def __init__(self, step_scale=1):
+        """Initialize player attributes, with the speed scaled by step_scale"""
         self.width = 50
         self.height = 50
         self.x = SCREEN_WIDTH // 2 - self.width // 2
         self.y = SCREEN_HEIGHT - self.height - 10
-        self.speed = 5
+        self.speed = 5 * step_scale
         self.color = WHITE
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.prev_x = self.x
+        self.draw_rect = self.rect.copy()  # Interpolated bounds for drawing
+        self.drawn = None  # Bounds at the last draw
     
-    def update(self):
-        """Update player movement based on key presses"""
-        keys = pygame.key.get_pressed()
+    def update(self, keys):
+        """Update player movement based on the held-key state"""
+        self.prev_x = self.x
         
         # Move left
         if keys[pygame.K_LEFT] and self.x > 0:
@@ -137,83 +283,119 @@ class Player:
         # Move right
         if keys[pygame.K_RIGHT] and self.x < SCREEN_WIDTH - self.width:
             self.x += self.speed
-    
-    def draw(self, screen):
-        """Draw the player on the screen"""
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
-    
-    def check_collision(self, asteroid):
-        """
-        Check if player collides with an asteroid
-        Uses simple rectangular collision detection
-        """
-        player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        asteroid_rect = pygame.Rect(asteroid.x, asteroid.y, asteroid.width, asteroid.height)
         
-        return player_rect.colliderect(asteroid_rect)
-
-class Asteroid:
-    """
-    Asteroid class representing obstacles the player must dodge.
-    Manages asteroid movement and drawing.
-    """
-    def __init__(self):
-        """Initialize asteroid with random properties"""
-        self.width = random.randint(30, 70)
-        self.height = random.randint(30, 70)
-        self.x = random.randint(0, SCREEN_WIDTH - self.width)
-        self.y = -self.height  # Start above the screen
-        self.speed = random.randint(3, 8)
-        self.color = (random.randint(100, 255), 0, 0)  # Varying shades of red
+        self.rect.x = self.x
     
-    def update(self):
-        """Move the asteroid downwards"""
-        self.y += self.speed
+    def place(self, alpha):
+        """Move the drawing bounds alpha of the way through the last step"""
+        self.draw_rect.x = round(lerp(self.prev_x, self.x, alpha))
     
     def draw(self, screen):
-        """Draw the asteroid on the screen"""
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
-    
-    def is_off_screen(self):
-        """Check if asteroid has moved off the bottom of the screen"""
-        return self.y > SCREEN_HEIGHT
+        """Draw the player on the screen"""
+        self.drawn = pygame.draw.rect(screen, self.color, self.draw_rect)
 
 class AsteroidManager:
     """
-    Manages a collection of asteroids.
-    Handles asteroid creation, updating, and removal.
+    Manages a collection of asteroids, the obstacles the player must dodge.
+    Asteroids are rows of an EntityStore, so moving, removing and
+    colliding them are whole-column operations; only drawing visits them
+    one at a time. Besides position, velocity, size and color, each row
+    keeps where it is drawn this frame (draw_y) and where it was last
+    drawn (drawn_y, if drawn), for the dirty-rect renderer.
     """
-    def __init__(self):
-        """Initialize the asteroid collection"""
-        self.asteroids = []
+    def __init__(self, step_scale=1):
+        """Initialize the asteroid collection, with speeds and the spawn interval scaled by step_scale"""
+        self.asteroids = EntityStore(ASTEROID_COMPONENTS)
+        self.step_scale = step_scale
         self.spawn_timer = 0
-        self.spawn_interval = 60  # Frames between asteroid spawns
+        self.spawn_interval = scale_steps(60, step_scale)  # Steps between asteroid spawns
+        self.removed = []  # Last drawn bounds of removed asteroids, still to be erased
+    
+    def spawn(self, y=None):
+        """
+        Add an asteroid with random properties, just above the screen
+        unless y is given, and return its handle
+        """
+        width = random.randint(*ASTEROID_SIZE)
+        height = random.randint(*ASTEROID_SIZE)
+        x = random.randint(0, SCREEN_WIDTH - width)
+        speed = random.randint(*ASTEROID_SPEED)
+        color = (random.randint(100, 255), 0, 0)  # Varying shades of red
+        if y is None:
+            y = -height
+        return self.asteroids.create(x=x, y=y, vy=speed * self.step_scale, width=width, height=height, color=color, draw_y=y)
     
     def update(self):
         """
         Update all asteroids:
-        - Move existing asteroids
+        - Move existing asteroids downwards
         - Remove off-screen asteroids
         - Spawn new asteroids
         """
-        # Update existing asteroids
-        for asteroid in self.asteroids[:]:
-            asteroid.update()
-            
-            # Remove asteroids that are off the screen
-            if asteroid.is_off_screen():
-                self.asteroids.remove(asteroid)
+        asteroids = self.asteroids
+        asteroids.move()
+        
+        # Remove asteroids that are off the screen, remembering what to erase
+        removed = asteroids.destroy_where(asteroids.y[:asteroids.end] > SCREEN_HEIGHT)
+        if len(removed):
+            self.removed += self.drawn_bounds(removed)
         
         # Spawn new asteroids
         self.spawn_timer += 1
         if self.spawn_timer >= self.spawn_interval:
-            self.asteroids.append(Asteroid())
+            self.spawn()
             self.spawn_timer = 0
     
+    def collides(self, rect):
+        """Check whether any asteroid overlaps a rect"""
+        return bool(self.asteroids.overlapping(rect.left, rect.top, rect.right, rect.bottom).any())
+    
+    def place(self, alpha):
+        """Move the drawing bounds alpha of the way through the last step"""
+        asteroids = self.asteroids
+        n = asteroids.end
+        prev_y = asteroids.prev_y[:n]
+        asteroids.draw_y[:n] = np.rint(prev_y + (asteroids.y[:n] - prev_y) * alpha)
+    
+    def drawn_bounds(self, rows):
+        """Return the on-screen bounds the asteroids in rows were last drawn at"""
+        asteroids = self.asteroids
+        rows = rows[asteroids.drawn[rows]]
+        top = np.maximum(asteroids.drawn_y[rows], 0)
+        bottom = np.minimum(asteroids.drawn_y[rows] + asteroids.height[rows], SCREEN_HEIGHT)
+        shown = bottom > top
+        return [pygame.Rect(x, y, width, height) for x, y, width, height in zip(
+            asteroids.x[rows][shown].tolist(), top[shown].tolist(),
+            asteroids.width[rows][shown].tolist(), (bottom - top)[shown].tolist())]
+    
+    def dirty_regions(self, dirty):
+        """
+        Append to dirty, for every asteroid, the on-screen union of where
+        it was last drawn and where it is drawn now
+        """
+        asteroids = self.asteroids
+        rows = asteroids.live()
+        draw_y = asteroids.draw_y[rows]
+        height = asteroids.height[rows]
+        drawn = asteroids.drawn[rows]
+        drawn_y = np.where(drawn, asteroids.drawn_y[rows], draw_y)
+        top = np.maximum(np.minimum(draw_y, drawn_y), 0)
+        bottom = np.minimum(np.maximum(draw_y, drawn_y) + height, SCREEN_HEIGHT)
+        shown = bottom > top
+        dirty += [pygame.Rect(x, y, width, height) for x, y, width, height in zip(
+            asteroids.x[rows][shown].tolist(), top[shown].tolist(),
+            asteroids.width[rows][shown].tolist(), (bottom - top)[shown].tolist())]
+    
     def draw(self, screen):
         """Draw all asteroids"""
-        for asteroid in self.asteroids:
-            asteroid.draw(screen)
+        asteroids = self.asteroids
+        rows = asteroids.live()
+        for x, y, width, height, color in zip(asteroids.x[rows].tolist(), asteroids.draw_y[rows].tolist(),
+                                              asteroids.width[rows].tolist(), asteroids.height[rows].tolist(),
+                                              asteroids.color[rows].tolist()):
+            pygame.draw.rect(screen, color, (x, y, width, height))
+        asteroids.drawn_y[rows] = asteroids.draw_y[rows]
+        asteroids.drawn[rows] = True
 
 # Run the game
 if __name__ == "__main__":
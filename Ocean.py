@@ -1,11 +1,30 @@
 import pygame
 import random
 import math
+from collections import OrderedDict
+
+import numpy as np
+
+from game_loop import FixedStepLoop, lerp, scale_steps, step_scale
+from headless import LiveInput, ScriptedInput, use_dummy_drivers
+from particles import ParticleSystem
+from profiler import FrameProfiler
+from quality import QualityGovernor
+from text_cache import TextCache
 
 # Game Configuration
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 FPS = 60
+EXHAUST_INTERVAL = 20  # Frames between the diver's breath bubbles
+CHUNK_HEIGHT = SCREEN_HEIGHT  # World slice generated at a time
+TERRAIN_STEP = 48  # Vertical pixels between wall nodes; divides CHUNK_HEIGHT
+WALL_DEPTH = 120  # How far the walls reach in from the screen edges
+VENT_INTERVAL = 30  # Frames between bubbles from each visible vent
+ABYSS_DEPTH = 10 * CHUNK_HEIGHT  # Depth at which the water stops darkening
+GRADIENT_STEP = 16  # Rows per band of the depth gradient; divides CHUNK_HEIGHT
+GRID_CELL = 128  # Side of a discovery grid cell; divides CHUNK_HEIGHT
+GRID_COLUMNS = SCREEN_WIDTH // GRID_CELL + 1
 
 # Color Palette
 DEEP_BLUE = (0, 32, 64)
@@ -14,43 +33,110 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 YELLOW = (255, 255, 0)
 DARK_BLUE = (0, 0, 128)
+ABYSS_BLUE = (0, 6, 16)  # Water colour at ABYSS_DEPTH and below
+LIGHT_DARKNESS = (0, 0, 0, 200)  # Overlay outside the diver's light
+
+# Quality levels the governor steps through under load, best first:
+# a smaller lit area (the scene is only drawn inside the light), then a
+# thinner bubble field, then half the internal resolution (2/3 costs
+# about as much to scale up as it saves)
+QUALITY_LEVELS = [
+    {'name': "full", 'light_area': 1, 'bubble_stride': 1, 'render_scale': 1},
+    {'name': "light area 3/4", 'light_area': 3 / 4, 'bubble_stride': 1, 'render_scale': 1},
+    {'name': "light area 1/2", 'light_area': 1 / 2, 'bubble_stride': 1, 'render_scale': 1},
+    {'name': "bubbles 1/2", 'light_area': 1 / 2, 'bubble_stride': 2, 'render_scale': 1},
+    {'name': "bubbles 1/4", 'light_area': 1 / 2, 'bubble_stride': 4, 'render_scale': 1},
+    {'name': "resolution 1/2", 'light_area': 1 / 2, 'bubble_stride': 4, 'render_scale': 1 / 2}
+]
 
 class OceanGame:
     """
     Main game class managing the entire underwater exploration experience
     """
-    def __init__(self):
-        """Initialize pygame and game systems"""
+    def __init__(self, headless=False, input_source=None, seed=None, adaptive_quality=True,
+                 render_scale=1, smooth_scaling=False, threaded=False, step_rate=FPS, render_rate=FPS):
+        """
+        Initialize pygame and game systems.
+        In headless mode no window is shown, nothing is drawn and input
+        comes from input_source (an idle script by default). The world is
+        generated from seed, a random one by default. With adaptive_quality
+        the render quality follows the frame budget.
+        With render_scale below 1 (e.g. 1/2 or 2/3) the scene is drawn into
+        a smaller surface and scaled up to the window once per frame, with
+        smoothscale if smooth_scaling; the HUD stays at native resolution.
+        With threaded the simulation runs on a worker thread and the main
+        thread draws snapshots of it.
+        The simulation steps step_rate times a second and frames are drawn
+        up to render_rate times; speeds and timers are tuned per FPS step
+        and scaled to the step rate, so the game plays the same at any.
+        """
+        self.headless = headless
+        self.threaded = threaded
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.step_scale = step_scale(step_rate, FPS)
+        if headless:
+            use_dummy_drivers()
+            self.input = input_source or ScriptedInput(fps=step_rate)
+        else:
+            self.input = input_source or LiveInput(step_rate)
+        
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Ocean Explorer: Underwater Discovery")
         
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
+        self.profiler = FrameProfiler()
+        self.loop = FixedStepLoop(step_rate, render_rate, profiler=self.profiler)
+        self.text = TextCache()
+        self.font = self.text.font(36)
+        self.overlay_font = self.text.font(20)
         
         # Create game objects
-        self.diver = Diver()
-        self.ocean = Ocean()
+        self.diver = Diver(self.step_scale)
+        self.ocean = Ocean(seed=self.seed, step_scale=self.step_scale)
         self.discovery_manager = DiscoveryManager()
+        self.follow_diver()
         
         # Game state variables
+        self.running = True
         self.score = 0
         self.depth = 0
         self.game_over = False
+        self.exhaust_timer = 0
+        self.exhaust_interval = scale_steps(EXHAUST_INTERVAL, self.step_scale)
         
         # Lighting system
         self.light_radius = 200
-        self.light_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.light_quality = 10  # Pixels between gradient rings
+        self.light_area = 1  # Share of the full light's area that is lit
+        self.light_masks = LightMaskCache()
+        
+        # Render state: the snapshot drawn when not threaded, and bubble thinning
+        self.snapshot = OceanSnapshot(live=True)
+        self.bubble_stride = 1
+        
+        # Internal resolution
+        self.max_render_scale = render_scale
+        self.smooth_scaling = smooth_scaling
+        self.render_scale = 1
+        self.scene = self.screen
+        
+        # Quality governor
+        self.adaptive_quality = adaptive_quality
+        self.governor = QualityGovernor(QUALITY_LEVELS, 1 / render_rate)
+        self.apply_quality()
     
     def handle_events(self):
         """Handle pygame events and user input"""
-        for event in pygame.event.get():
+        events = [] if self.headless else self.loop.events()
+        self.input.advance(events)
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
-            
-            # Restart game
-            if self.game_over and event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                self.reset_game()
+            self.profiler.handle_event(event)
+        
+        # Restart game
+        if self.game_over and pygame.K_r in self.input.key_downs:
+            self.reset_game()
         
         return True
     
@@ -58,11 +144,18 @@ class OceanGame:
         """Update game logic each frame"""
         if not self.game_over:
             # Update diver
-            self.diver.update()
+            self.diver.update(self.input.get_pressed())
             
-            # Update ocean and its elements
+            # Scroll the world with the diver, then update ocean elements
+            self.follow_diver()
             self.ocean.update()
             
+            # Breathe out a bubble now and then
+            self.exhaust_timer += 1
+            if self.exhaust_timer >= self.exhaust_interval:
+                self.ocean.emit_exhaust(self.diver)
+                self.exhaust_timer = 0
+            
             # Update discoveries
             self.discovery_manager.update(self.diver)
             
@@ -70,6 +163,8 @@ class OceanGame:
             discovered = self.discovery_manager.check_discoveries(self.diver)
             if discovered:
                 self.score += discovered
+                self.ocean.emit_burst(self.diver.x + self.diver.width // 2,
+                                      self.diver.y + self.diver.height // 2)
             
             # Update depth
             self.depth = abs(self.diver.y)
@@ -77,70 +172,185 @@ class OceanGame:
             # Check for game over conditions
             if self.diver.oxygen <= 0:
                 self.game_over = True
+                # Nothing moves on the game over screen, so collect garbage now
+                self.loop.collect_garbage()
+    
+    def camera_for(self, diver_y):
+        """Return the top of the view that keeps a diver at diver_y centred"""
+        return max(0, diver_y + self.diver.height // 2 - SCREEN_HEIGHT // 2)
     
-    def draw(self):
-        """Draw all game elements with dynamic lighting"""
-        # Clear the screen with ocean background
-        self.screen.fill(DEEP_BLUE)
+    def follow_diver(self):
+        """Scroll the ocean to the diver and sync discoveries with the loaded chunks"""
+        loaded, evicted = self.ocean.scroll(self.camera_for(self.diver.y))
+        for chunk in evicted:
+            self.discovery_manager.remove_chunk(chunk)
+        for chunk in loaded:
+            self.discovery_manager.add_chunk(chunk)
+    
+    def capture(self, snapshot):
+        """Copy what draw() needs from the simulation into a snapshot and return it"""
+        if snapshot.live:
+            snapshot.diver = self.diver
+            snapshot.bubbles = self.ocean.bubbles
+        else:
+            diver = snapshot.diver
+            diver.x = self.diver.x
+            diver.y = self.diver.y
+            diver.prev_x = self.diver.prev_x
+            diver.prev_y = self.diver.prev_y
+            diver.oxygen = self.diver.oxygen
+            snapshot.bubbles.copy_from(self.ocean.bubbles)
+        snapshot.ocean = self.ocean
+        snapshot.camera_y = self.ocean.camera_y
+        self.discovery_manager.visible(snapshot.camera_y, snapshot.discoveries)
+        snapshot.score = self.score
+        snapshot.depth = self.depth
+        snapshot.game_over = self.game_over
+        return snapshot
+    
+    def draw(self, alpha=1.0, snapshot=None):
+        """
+        Draw all game elements with dynamic lighting, moving things alpha
+        of the way from their previous to their current simulated position.
+        Everything is drawn from snapshot, a capture of the simulation,
+        which by default refers to the current state.
+        """
+        if snapshot is None:
+            snapshot = self.capture(self.snapshot)
+        
+        # Trade quality for time when the last frames ran over budget
+        if self.adaptive_quality and self.governor.record(self.loop.busy):
+            self.apply_quality()
+        
+        # The camera follows the interpolated diver
+        diver = snapshot.diver
+        camera_y = self.camera_for(diver.position(alpha)[1])
+        scene = self.scene
+        scale = self.render_scale
+        
+        # Nothing outside the diver's light can be seen, so draw only inside it
+        light_rect = self.light_rect(alpha, camera_y, diver)
+        scene.set_clip(light_rect)
         
-        # Draw ocean elements
-        self.ocean.draw(self.screen)
+        # Draw ocean background and elements
+        snapshot.ocean.draw_background(scene, camera_y, scale)
+        snapshot.bubbles.draw(scene, alpha, snapshot.camera_y - camera_y, self.bubble_stride, scale)
         
         # Draw discoveries
-        self.discovery_manager.draw(self.screen)
+        for discovery in snapshot.discoveries:
+            discovery.draw(scene, camera_y, scale)
         
         # Draw diver
-        self.diver.draw(self.screen)
+        diver.draw(scene, alpha, camera_y, scale)
+        scene.set_clip(None)
         
         # Create lighting effect
-        self.create_lighting_effect()
+        with self.profiler.section('create_lighting_effect'):
+            self.create_lighting_effect(alpha, camera_y, diver)
+        
+        # Scale a reduced-resolution scene up to the window
+        if scene is not self.screen:
+            with self.profiler.section('scale_scene'):
+                self.scale_scene(light_rect)
         
         # Draw UI
-        self.draw_ui()
+        self.draw_ui(snapshot)
+        self.profiler.draw_overlay(self.screen, self.text, self.overlay_font)
         
         # Update display
-        pygame.display.flip()
+        with self.profiler.section('display.flip'):
+            pygame.display.flip()
+    
+    def apply_quality(self):
+        """Apply the governor's current quality level to the lighting, bubbles and resolution"""
+        settings = self.governor.settings
+        self.light_area = settings['light_area']
+        self.bubble_stride = settings['bubble_stride']
+        self.set_render_scale(min(settings['render_scale'], self.max_render_scale))
+        self.profiler.note('quality', self.governor.describe())
+    
+    def set_render_scale(self, scale):
+        """Draw the scene at scale times the window size from the next frame on"""
+        if scale == self.render_scale:
+            return
+        self.render_scale = scale
+        if scale < 1:
+            size = (round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale))
+            self.scene = pygame.Surface(size).convert(self.screen)
+        else:
+            self.scene = self.screen
+    
+    def light_mask(self):
+        """Return the cached light mask for the lit area, at the scene's resolution"""
+        scale = self.render_scale
+        return self.light_masks.get(round(self.light_radius * math.sqrt(self.light_area) * scale),
+                                    max(round(self.light_quality * scale), 1))
+    
+    def light_rect(self, alpha=1.0, camera_y=0, diver=None):
+        """Return the scene rect the light mask covers around the diver"""
+        scale = self.render_scale
+        x, y = (diver or self.diver).position(alpha)
+        return self.light_mask().get_rect(center=(int(x * scale), int((y - camera_y) * scale)))
     
-    def create_lighting_effect(self):
+    def create_lighting_effect(self, alpha=1.0, camera_y=0, diver=None):
         """Create a dynamic lighting system for underwater exploration"""
-        # Clear previous lighting
-        self.light_surface.fill((0, 0, 0, 200))  # Dark overlay
-        
-        # Create radial gradient light around the diver
-        for r in range(self.light_radius, 0, -10):
-            alpha = int(255 * (r / self.light_radius) ** 2)
-            light_color = (255, 255, 255, alpha)
-            pygame.draw.circle(
-                self.light_surface, 
-                light_color, 
-                (int(self.diver.x), int(self.diver.y)), 
-                r
-            )
-        
-        # Blend lighting with screen
-        self.screen.blit(self.light_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-    
-    def draw_ui(self):
+        # Blend the cached light mask around the diver
+        light_rect = self.light_rect(alpha, camera_y, diver)
+        self.scene.blit(self.light_mask(), light_rect, special_flags=pygame.BLEND_RGBA_MULT)
+        
+        # Outside the mask the overlay multiplies colour by black, which is
+        # the same as a plain fill of the four bands around it
+        self.fill_around(self.scene, light_rect)
+    
+    def fill_around(self, surface, rect):
+        """Fill everything on a surface outside rect with black"""
+        width, height = surface.get_size()
+        lit = rect.clip(surface.get_rect())
+        for band in (
+            (0, 0, width, lit.top),
+            (0, lit.bottom, width, height - lit.bottom),
+            (0, lit.top, lit.left, lit.height),
+            (lit.right, lit.top, width - lit.right, lit.height)
+        ):
+            if band[2] > 0 and band[3] > 0:
+                surface.fill(BLACK, band)
+    
+    def scale_scene(self, light_rect):
+        """
+        Scale the lit part of the reduced-resolution scene up to the
+        window; the rest of the scene is black, so the window around it
+        is filled instead
+        """
+        scene = self.scene
+        lit = light_rect.clip(scene.get_rect())
+        x_factor = SCREEN_WIDTH / scene.get_width()
+        y_factor = SCREEN_HEIGHT / scene.get_height()
+        left, top = round(lit.left * x_factor), round(lit.top * y_factor)
+        target = pygame.Rect(left, top, round(lit.right * x_factor) - left, round(lit.bottom * y_factor) - top)
+        if target.width and target.height:
+            scale = pygame.transform.smoothscale if self.smooth_scaling else pygame.transform.scale
+            scale(scene.subsurface(lit), target.size, self.screen.subsurface(target))
+        self.fill_around(self.screen, target)
+    
+    def draw_ui(self, snapshot):
         """Draw game user interface"""
-        if not self.game_over:
+        if not snapshot.game_over:
             # Oxygen bar
             oxygen_width = 200
             oxygen_height = 20
-            oxygen_percentage = self.diver.oxygen / self.diver.max_oxygen
+            oxygen_percentage = snapshot.diver.oxygen / snapshot.diver.max_oxygen
             pygame.draw.rect(self.screen, WHITE, 
                              (10, 10, oxygen_width, oxygen_height), 2)
             pygame.draw.rect(self.screen, (0, 255, 0), 
                              (10, 10, oxygen_width * oxygen_percentage, oxygen_height))
             
             # Score and depth
-            score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-            depth_text = self.font.render(f"Depth: {int(self.depth)}m", True, WHITE)
-            self.screen.blit(score_text, (10, 40))
-            self.screen.blit(depth_text, (10, 80))
+            self.text.draw_number(self.screen, self.font, "Score: ", snapshot.score, WHITE, (10, 40))
+            self.text.draw_number(self.screen, self.font, "Depth: ", snapshot.depth, WHITE, (10, 80), suffix="m")
         else:
             # Game over screen
-            game_over_text = self.font.render("Game Over!", True, WHITE)
-            restart_text = self.font.render("Press R to Restart", True, WHITE)
+            game_over_text = self.text.render(self.font, "Game Over!", WHITE)
+            restart_text = self.text.render(self.font, "Press R to Restart", WHITE)
             self.screen.blit(game_over_text, 
                              (SCREEN_WIDTH//2 - game_over_text.get_width()//2, 
                               SCREEN_HEIGHT//2 - 50))
@@ -150,58 +360,137 @@ class OceanGame:
     
     def reset_game(self):
         """Reset the game to its initial state"""
-        self.diver = Diver()
-        self.ocean = Ocean()
+        self.diver = Diver(self.step_scale)
+        self.ocean = Ocean(seed=self.seed, step_scale=self.step_scale)
         self.discovery_manager = DiscoveryManager()
+        self.follow_diver()
         self.score = 0
         self.depth = 0
         self.game_over = False
+        self.exhaust_timer = 0
     
-    def run(self):
-        """Main game loop"""
-        running = True
-        while running:
-            # Handle events
-            running = self.handle_events()
-            
-            # Update game state
+    def step(self):
+        """Advance the simulation by one fixed step"""
+        # Handle events
+        with self.profiler.section('handle_events'):
+            self.running = self.handle_events()
+        
+        # Update game state
+        with self.profiler.section('update'):
             self.update()
-            
-            # Draw everything
-            self.draw()
-            
-            # Control game speed
-            self.clock.tick(FPS)
+    
+    def is_running(self):
+        """
+        Check whether the main loop should keep going. Headless runs with
+        endless input (the idle script by default) end at game over, as
+        Shooter's do, instead of idling on forever; a scripted sequence
+        such as a replay, which may restart, plays out to its end.
+        """
+        if self.headless and self.game_over and self.input.endless:
+            return False
+        return self.running and not self.input.finished
+    
+    def run(self, max_frames=None):
+        """
+        Main game loop.
+        Stops on quit, after max_frames frames, or when a scripted input
+        runs out. The simulation steps at a fixed FPS whatever the render
+        cost; headless runs skip drawing and step as fast as possible.
+        """
+        self.running = True
+        if self.threaded and not self.headless:
+            self.loop.run_threaded(self.step, self.capture, self.draw, self.is_running,
+                                   OceanSnapshot, max_frames)
+        else:
+            self.loop.run(self.step, self.draw, self.is_running, max_frames, self.headless)
         
         # Quit the game
         pygame.quit()
 
+class OceanSnapshot:
+    """
+    Render state of one simulation step: copies of the diver and bubbles,
+    the discoveries around the view and the HUD values. The ocean itself
+    is shared; its chunks never change once generated. A live snapshot
+    refers to the game's own diver and bubbles instead, for drawing on
+    the simulation's thread without copying them.
+    """
+    def __init__(self, live=False):
+        """Allocate the copies, filled in by OceanGame.capture"""
+        self.live = live
+        self.time = 0.0
+        self.diver = None if live else Diver()
+        self.ocean = None
+        self.camera_y = 0
+        self.bubbles = None if live else ParticleSystem(SCREEN_WIDTH, SCREEN_HEIGHT, seed=0)
+        self.discoveries = []
+        self.score = 0
+        self.depth = 0
+        self.game_over = False
+
+class LightMaskCache:
+    """
+    Pre-rendered radial light masks, keyed by radius and ring spacing.
+    Each mask is only as big as the light itself, so building it once
+    replaces a full-screen fill and circle stack every frame.
+    """
+    def __init__(self, max_entries=4):
+        """Initialize an empty cache holding at most max_entries masks"""
+        self.masks = OrderedDict()
+        self.max_entries = max_entries
+    
+    def get(self, radius, quality):
+        """Return the mask for a light radius, building it on first use"""
+        key = (radius, quality)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = self.build(radius, quality)
+            self.masks[key] = mask
+            if len(self.masks) > self.max_entries:
+                self.masks.popitem(last=False)
+        else:
+            self.masks.move_to_end(key)
+        return mask
+    
+    def build(self, radius, quality):
+        """Render the dark overlay with a radial gradient of light rings"""
+        size = radius * 2 + 1
+        mask = pygame.Surface((size, size), pygame.SRCALPHA)
+        mask.fill(LIGHT_DARKNESS)
+        for r in range(radius, 0, -quality):
+            alpha = int(255 * (r / radius) ** 2)
+            pygame.draw.circle(mask, (255, 255, 255, alpha), (radius, radius), r)
+        return mask
+
 class Diver:
     """Represents the player's diving character"""
-    def __init__(self):
-        """Initialize diver attributes"""
+    def __init__(self, step_scale=1):
+        """Initialize diver attributes, with per-step rates scaled by step_scale"""
         self.width = 40
         self.height = 60
         self.x = SCREEN_WIDTH // 2
         self.y = SCREEN_HEIGHT // 2
+        self.prev_x = self.x
+        self.prev_y = self.y
         
         # Movement
-        self.speed = 5
+        self.speed = 5 * step_scale
         self.velocity_x = 0
         self.velocity_y = 0
+        self.friction = 0.9 ** step_scale  # Friction while coasting
         
         # Oxygen system
         self.max_oxygen = 1000
         self.oxygen = self.max_oxygen
-        self.oxygen_drain_rate = 1
+        self.oxygen_drain_rate = 1 * step_scale
+        self.oxygen_restore_rate = 2 * step_scale
         
         # Color
         self.color = (0, 200, 255)
     
-    def update(self):
-        """Update diver movement and oxygen"""
-        # Handle input for movement
-        keys = pygame.key.get_pressed()
+    def update(self, keys):
+        """Update diver movement and oxygen from the held-key state"""
+        self.prev_x, self.prev_y = self.x, self.y
         
         # Horizontal movement
         if keys[pygame.K_LEFT]:
@@ -209,7 +498,7 @@ class Diver:
         elif keys[pygame.K_RIGHT]:
             self.velocity_x = self.speed
         else:
-            self.velocity_x *= 0.9  # Friction
+            self.velocity_x *= self.friction
         
         # Vertical movement
         if keys[pygame.K_UP]:
@@ -217,142 +506,360 @@ class Diver:
         elif keys[pygame.K_DOWN]:
             self.velocity_y = self.speed
         else:
-            self.velocity_y *= 0.9  # Friction
+            self.velocity_y *= self.friction
         
         # Update position
         self.x += self.velocity_x
         self.y += self.velocity_y
         
-        # Keep diver on screen
+        # Keep diver between the screen edges and below the surface
         self.x = max(0, min(self.x, SCREEN_WIDTH - self.width))
-        self.y = max(0, min(self.y, SCREEN_HEIGHT - self.height))
+        self.y = max(0, self.y)
         
         # Drain oxygen
         self.oxygen -= self.oxygen_drain_rate
         
         # Slowly restore oxygen when near surface
         if self.y < 100:
-            self.oxygen = min(self.max_oxygen, self.oxygen + 2)
+            self.oxygen = min(self.max_oxygen, self.oxygen + self.oxygen_restore_rate)
     
-    def draw(self, screen):
-        """Draw the diver"""
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
+    def position(self, alpha=1.0):
+        """Return the position alpha of the way through the last step"""
+        return lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha)
+    
+    def draw(self, screen, alpha=1.0, camera_y=0, scale=1):
+        """Draw the diver, at scale times its size on a reduced-resolution screen"""
+        x, y = self.position(alpha)
+        y -= camera_y
+        pygame.draw.rect(screen, self.color,
+                         (x * scale, y * scale, self.width * scale, self.height * scale))
         
         # Draw simple dive mask
         pygame.draw.circle(screen, WHITE, 
-                           (int(self.x + self.width // 2), 
-                            int(self.y + self.height // 4)), 
-                           10)
+                           (int((x + self.width // 2) * scale), 
+                            int((y + self.height // 4) * scale)), 
+                           round(10 * scale))
+
+class Chunk:
+    """One screen-tall horizontal slice of the ocean, generated from the world seed"""
+    def __init__(self, index, left_wall, right_wall, vents, discoveries):
+        """Hold the generated content of the slice"""
+        self.index = index
+        self.top = index * CHUNK_HEIGHT
+        self.left_wall = left_wall  # World-space polylines down both sides
+        self.right_wall = right_wall
+        self.vents = vents  # World-space points that stream bubbles
+        self.discoveries = discoveries  # (key, class, x, y) spawn descriptions
 
 class Ocean:
-    """Manages ocean environment and background elements"""
-    def __init__(self):
-        """Initialize ocean characteristics"""
-        self.bubbles = []
-        self.create_initial_bubbles()
-        
-        # Create underwater terrain
-        self.terrain = self.generate_terrain()
-    
-    def create_initial_bubbles(self):
-        """Generate initial set of bubbles"""
-        for _ in range(50):
-            self.bubbles.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(0, SCREEN_HEIGHT),
-                'speed': random.uniform(0.5, 2),
-                'size': random.randint(2, 10)
-            })
-    
-    def generate_terrain(self):
-        """Generate procedural underwater terrain"""
-        terrain = []
-        x = 0
-        y = SCREEN_HEIGHT * 0.7
-        while x < SCREEN_WIDTH:
-            terrain.append((x, y))
-            # Add some randomness to terrain
-            y += random.randint(-20, 20)
-            y = max(SCREEN_HEIGHT * 0.6, min(y, SCREEN_HEIGHT * 0.9))
-            x += 50
-        return terrain
+    """
+    Manages the ocean environment: a vertical world of lazily generated
+    chunks around the camera, and the bubbles drifting through the view.
+    Chunks are generated from the world seed and their index alone, so an
+    evicted chunk comes back identical, and at most max_chunks are cached.
+    Bubbles live in view space and are shifted as the camera scrolls.
+    The static layers (water gradient and walls) are pre-rendered into a
+    surface two chunks tall, re-rendered only when the view reaches
+    another chunk, so a frame starts with a single blit.
+    """
+    def __init__(self, bubble_count=50, seed=0, max_chunks=6, step_scale=1):
+        """Initialize ocean characteristics, with bubble motion and timers scaled by step_scale"""
+        self.seed = seed
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.camera_y = 0
+        self.frame = 0
+        self.vent_interval = scale_steps(VENT_INTERVAL, step_scale)
+        self.background = None
+        self.background_chunk = None  # Index of the chunk at the top of the background
+        self.background_scale = 1
+        self.scaled_background = None  # The background at background_scale, if below 1
+        
+        self.bubbles = ParticleSystem(SCREEN_WIDTH, SCREEN_HEIGHT, capacity=bubble_count, step_scale=step_scale)
+        self.create_initial_bubbles(bubble_count)
+    
+    def create_initial_bubbles(self, count):
+        """Generate initial set of bubbles drifting up forever"""
+        rng = self.bubbles.rng
+        self.bubbles.emit(
+            count,
+            x=rng.integers(0, SCREEN_WIDTH, count, endpoint=True),
+            y=rng.integers(0, SCREEN_HEIGHT, count, endpoint=True),
+            vx=0,
+            vy=-rng.uniform(0.5, 2, count),
+            size=rng.integers(2, 10, count, endpoint=True)
+        )
+    
+    def emit_burst(self, x, y, count=20):
+        """Release a short-lived burst of small bubbles at a world point, e.g. on a pickup"""
+        rng = self.bubbles.rng
+        angle = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(0.5, 3, count)
+        self.bubbles.emit(
+            count, x, y - self.camera_y,
+            vx=np.cos(angle) * speed,
+            vy=np.sin(angle) * speed - 1,
+            size=rng.integers(2, 4, count, endpoint=True),
+            life=rng.integers(20, 45, count, endpoint=True)
+        )
+    
+    def emit_exhaust(self, diver):
+        """Release one bubble from the diver's mask"""
+        rng = self.bubbles.rng
+        self.bubbles.emit(
+            1, diver.x + diver.width // 2, diver.y + diver.height // 4 - self.camera_y,
+            vx=rng.uniform(-0.3, 0.3),
+            vy=-rng.uniform(1, 2),
+            size=2,
+            life=90
+        )
+    
+    def wall_node(self, node):
+        """Return the (left, right) wall x at a terrain node, the same for every chunk that shares it"""
+        rng = random.Random(f"{self.seed}/wall/{node}")
+        return rng.randint(20, WALL_DEPTH), SCREEN_WIDTH - rng.randint(20, WALL_DEPTH)
+    
+    def generate_chunk(self, index):
+        """Generate procedural walls, bubble vents and discovery spawns for a chunk"""
+        rng = random.Random(f"{self.seed}/chunk/{index}")
+        top = index * CHUNK_HEIGHT
+        first = top // TERRAIN_STEP
+        nodes = range(first, first + CHUNK_HEIGHT // TERRAIN_STEP + 1)
+        walls = [self.wall_node(node) for node in nodes]
+        left_wall = [(left, node * TERRAIN_STEP) for node, (left, _) in zip(nodes, walls)]
+        right_wall = [(right, node * TERRAIN_STEP) for node, (_, right) in zip(nodes, walls)]
+        
+        # Vents sit on the walls
+        vents = []
+        for _ in range(rng.randint(0, 2)):
+            left, right = walls[rng.randrange(len(walls))]
+            y = top + rng.randint(0, CHUNK_HEIGHT)
+            vents.append((left if rng.random() < 0.5 else right, y))
+        
+        # Deeper chunks hold more discoveries; none right at the surface
+        discoveries = []
+        for number in range(rng.randint(1, 2 + min(index, 4))):
+            discovery_class = rng.choice(DISCOVERY_TYPES)
+            x = rng.randint(WALL_DEPTH + 30, SCREEN_WIDTH - WALL_DEPTH - 30)
+            y = top + rng.randint(100 if index == 0 else 0, CHUNK_HEIGHT - 1)
+            discoveries.append(((index, number), discovery_class, x, y))
+        
+        return Chunk(index, left_wall, right_wall, vents, discoveries)
+    
+    def chunk(self, index):
+        """Return a chunk from the cache, generating it on a miss"""
+        chunk = self.chunks.get(index)
+        if chunk is None:
+            chunk = self.generate_chunk(index)
+            self.chunks[index] = chunk
+        else:
+            self.chunks.move_to_end(index)
+        return chunk
+    
+    def visible_chunks(self, camera_y):
+        """Yield the chunks overlapping the view at camera_y"""
+        first = int(camera_y // CHUNK_HEIGHT)
+        last = int((camera_y + SCREEN_HEIGHT - 1) // CHUNK_HEIGHT)
+        for index in range(max(first, 0), last + 1):
+            yield self.chunk(index)
+    
+    def scroll(self, camera_y):
+        """
+        Move the view to camera_y. Chunks from one above to one below the
+        view are kept loaded; return the lists of chunks that were loaded
+        and evicted by the move.
+        """
+        # View-space bubbles stay put in the water while the camera moves;
+        # the endless ones wrap around the view like a repeating field
+        if camera_y != self.camera_y:
+            count = len(self.bubbles)
+            y = self.bubbles.y[:count]
+            y -= camera_y - self.camera_y
+            endless = self.bubbles.life[:count] < 0
+            y[endless] %= SCREEN_HEIGHT
+            self.camera_y = camera_y
+        
+        first = max(int(camera_y // CHUNK_HEIGHT) - 1, 0)
+        last = int((camera_y + SCREEN_HEIGHT) // CHUNK_HEIGHT) + 1
+        loaded = []
+        for index in range(first, last + 1):
+            if index not in self.chunks:
+                loaded.append(self.chunk(index))
+            else:
+                self.chunks.move_to_end(index)
+        
+        evicted = []
+        while len(self.chunks) > self.max_chunks:
+            evicted.append(self.chunks.popitem(last=False)[1])
+        return loaded, evicted
     
     def update(self):
         """Update ocean elements"""
-        # Update bubbles
-        for bubble in self.bubbles:
-            bubble['y'] -= bubble['speed']
-            
-            # Reset bubble if it goes off screen
-            if bubble['y'] < 0:
-                bubble['y'] = SCREEN_HEIGHT
-                bubble['x'] = random.randint(0, SCREEN_WIDTH)
-    
-    def draw(self, screen):
-        """Draw ocean elements"""
-        # Draw bubbles
-        for bubble in self.bubbles:
-            pygame.draw.circle(screen, (255, 255, 255, 100), 
-                               (int(bubble['x']), int(bubble['y'])), 
-                               int(bubble['size']))
-        
-        # Draw terrain
-        if len(self.terrain) > 1:
-            pygame.draw.lines(screen, (100, 100, 100), False, self.terrain, 3)
-
-class DiscoveryManager:
-    """Manages underwater discoveries and collectibles"""
-    def __init__(self):
-        """Initialize discoveries"""
-        self.discoveries = []
-        self.spawn_timer = 0
-        self.spawn_interval = 180  # Frames between spawns
-    
-    def update(self, diver):
-        """Update discovery spawning and management"""
-        self.spawn_timer += 1
+        self.frame += 1
         
-        # Spawn new discoveries periodically
-        if self.spawn_timer >= self.spawn_interval:
-            self.spawn_discovery(diver)
-            self.spawn_timer = 0
+        # Visible vents breathe out a bubble now and then
+        if self.frame % self.vent_interval == 0:
+            rng = self.bubbles.rng
+            for chunk in self.visible_chunks(self.camera_y):
+                for x, y in chunk.vents:
+                    self.bubbles.emit(
+                        1, x, y - self.camera_y,
+                        vx=rng.uniform(-0.2, 0.2),
+                        vy=-rng.uniform(1, 2.5),
+                        size=rng.integers(2, 5, endpoint=True),
+                        life=120
+                    )
         
-        # Remove collected or out-of-bounds discoveries
-        self.discoveries = [
-            d for d in self.discoveries 
-            if not d.is_collected and d.y < SCREEN_HEIGHT
-        ]
+        self.bubbles.update()
+    
+    def draw_background(self, screen, camera_y, scale=1):
+        """Draw the water and terrain with the view at camera_y, in one blit"""
+        first = int(camera_y // CHUNK_HEIGHT)
+        if first != self.background_chunk or scale != self.background_scale:
+            self.render_background(first, scale)
+        background = self.background if scale == 1 else self.scaled_background
+        screen.blit(background, (0, 0),
+                    (0, (camera_y - first * CHUNK_HEIGHT) * scale, SCREEN_WIDTH * scale, SCREEN_HEIGHT * scale))
     
-    def spawn_discovery(self, diver):
-        """Spawn a new discovery based on current depth"""
-        discovery_types = [
-            TreasureChest,
-            SeaCreature,
-            AncientArtifact
-        ]
+    def render_background(self, first, scale=1):
+        """
+        Render the static layers of chunk first and the one below it into
+        the background, and a copy scaled by scale if it is below 1
+        """
+        if self.background is None:
+            self.background = pygame.Surface((SCREEN_WIDTH, 2 * CHUNK_HEIGHT))
+            if pygame.display.get_surface() is not None:
+                self.background = self.background.convert()
         
-        # Choose discovery type
-        discovery_class = random.choice(discovery_types)
+        if first != self.background_chunk:
+            self.render_static(self.background, first * CHUNK_HEIGHT, 0, 2 * CHUNK_HEIGHT)
+            self.background_chunk = first
         
-        # Spawn near, but not too close to the diver
-        x = random.randint(0, SCREEN_WIDTH)
-        y = random.randint(100, SCREEN_HEIGHT)
+        if scale != 1:
+            size = (round(SCREEN_WIDTH * scale), round(2 * CHUNK_HEIGHT * scale))
+            if self.scaled_background is None or self.scaled_background.get_size() != size:
+                self.scaled_background = pygame.Surface(size)
+                if pygame.display.get_surface() is not None:
+                    self.scaled_background = self.scaled_background.convert()
+            pygame.transform.smoothscale(self.background, size, self.scaled_background)
+        self.background_scale = scale
+    
+    def render_static(self, surface, top, y, height):
+        """Paint the water and walls of world rows top to top + height at row y of surface"""
+        surface.set_clip((0, y, SCREEN_WIDTH, height))
+        offset = top - y
+        
+        # Water darkens with depth
+        for row in range(y, y + height, GRADIENT_STEP):
+            depth = min((row + offset) / ABYSS_DEPTH, 1)
+            color = [int(lerp(shallow, deep, depth)) for shallow, deep in zip(DEEP_BLUE, ABYSS_BLUE)]
+            surface.fill(color, (0, row, SCREEN_WIDTH, GRADIENT_STEP))
         
-        self.discoveries.append(discovery_class(x, y))
+        # Walls, including the ends of neighbouring chunks that reach across
+        # the edges. Rendering only reads the cache, so a render thread never
+        # reorders it under the simulation; a missing chunk is regenerated.
+        first = max(int(top // CHUNK_HEIGHT) - 1, 0)
+        last = int((top + height) // CHUNK_HEIGHT)
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index) or self.generate_chunk(index)
+            for wall in (chunk.left_wall, chunk.right_wall):
+                pygame.draw.lines(surface, (100, 100, 100), False,
+                                  [(x, wall_y - offset) for x, wall_y in wall], 3)
+        surface.set_clip(None)
+
+class DiscoveryManager:
+    """
+    Manages underwater discoveries and collectibles.
+    Discoveries are kept in a uniform grid of GRID_CELL squares, so the
+    diver is only tested against the cells within reach and only visible
+    rows are drawn. Collected discoveries are pruned in place, and only
+    from the cells they were collected in.
+    """
+    def __init__(self):
+        """Initialize discoveries"""
+        self.cells = {}  # row * GRID_COLUMNS + column -> discoveries in that cell
+        self.count = 0
+        self.max_size = 0  # Largest discovery radius, which bounds the collision reach
+        self.collected = set()  # Keys of collected chunk discoveries, so they stay collected
+        self.stale = []  # Cells holding collected discoveries, pruned by update()
+    
+    def add(self, discovery):
+        """Place a discovery in its grid cell"""
+        cell = int(discovery.y) // GRID_CELL * GRID_COLUMNS + int(discovery.x) // GRID_CELL
+        discoveries = self.cells.get(cell)
+        if discoveries is None:
+            discoveries = self.cells[cell] = []
+        discoveries.append(discovery)
+        self.count += 1
+        self.max_size = max(self.max_size, discovery.size)
+    
+    def add_chunk(self, chunk):
+        """Place the discoveries of a newly loaded chunk that were not collected yet"""
+        for key, discovery_class, x, y in chunk.discoveries:
+            if key not in self.collected:
+                discovery = discovery_class(x, y)
+                discovery.key = key
+                self.add(discovery)
+    
+    def remove_chunk(self, chunk):
+        """Drop the discoveries of an evicted chunk; they come back with it"""
+        first = chunk.top // GRID_CELL * GRID_COLUMNS
+        for cell in range(first, first + CHUNK_HEIGHT // GRID_CELL * GRID_COLUMNS):
+            discoveries = self.cells.pop(cell, None)
+            if discoveries:
+                self.count -= len(discoveries)
+    
+    def update(self, diver):
+        """Update discovery management"""
+        # Remove collected discoveries from the cells they were found in
+        stale = self.stale
+        for discoveries in stale:
+            kept = 0
+            for discovery in discoveries:
+                if not discovery.is_collected:
+                    discoveries[kept] = discovery
+                    kept += 1
+            self.count -= len(discoveries) - kept
+            del discoveries[kept:]
+        stale.clear()
     
     def check_discoveries(self, diver):
         """Check for discoveries near the diver"""
         score = 0
-        for discovery in self.discoveries:
-            if discovery.check_collision(diver):
-                score += discovery.value
-                discovery.is_collected = True
+        reach = self.max_size + max(diver.width, diver.height)
+        first_column = max(int(diver.x - reach) // GRID_CELL, 0)
+        last_column = min(int(diver.x + reach) // GRID_CELL, GRID_COLUMNS - 1)
+        for row in range(max(int(diver.y - reach) // GRID_CELL, 0), int(diver.y + reach) // GRID_CELL + 1):
+            for cell in range(row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column + 1):
+                discoveries = self.cells.get(cell)
+                if not discoveries:
+                    continue
+                for discovery in discoveries:
+                    if not discovery.is_collected and discovery.check_collision(diver):
+                        score += discovery.value
+                        discovery.is_collected = True
+                        if discovery.key is not None:
+                            self.collected.add(discovery.key)
+                        if not self.stale or self.stale[-1] is not discoveries:
+                            self.stale.append(discoveries)
         return score
     
-    def draw(self, screen):
-        """Draw all discoveries"""
-        for discovery in self.discoveries:
-            discovery.draw(screen)
+    def visible(self, camera_y, found):
+        """
+        Refill the list found with the uncollected discoveries in the grid
+        rows around the view at camera_y, one row of margin either side
+        """
+        found.clear()
+        first = max(int(camera_y) // GRID_CELL - 1, 0) * GRID_COLUMNS
+        last = ((int(camera_y) + SCREEN_HEIGHT) // GRID_CELL + 2) * GRID_COLUMNS
+        cells = self.cells
+        for cell in range(first, last):
+            discoveries = cells.get(cell)
+            if discoveries:
+                for discovery in discoveries:
+                    if not discovery.is_collected:
+                        found.append(discovery)
+        return found
 
 class Discovery:
     """Base class for underwater discoveries"""
@@ -364,19 +871,20 @@ class Discovery:
         self.color = color
         self.value = value
         self.is_collected = False
+        self.key = None  # (chunk index, number) for chunk-spawned discoveries
     
     def check_collision(self, diver):
         """Check if diver is close enough to collect"""
-        # Calculate distance between diver and discovery
-        distance = math.sqrt(
-            (self.x - diver.x)**2 + 
-            (self.y - diver.y)**2
-        )
-        return distance < (self.size + max(diver.width, diver.height))
+        # Compare squared distance between diver and discovery
+        dx = self.x - diver.x
+        dy = self.y - diver.y
+        reach = self.size + max(diver.width, diver.height)
+        return dx * dx + dy * dy < reach * reach
     
-    def draw(self, screen):
+    def draw(self, screen, camera_y=0, scale=1):
         """Draw discovery"""
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
+        pygame.draw.circle(screen, self.color, (int(self.x * scale), int((self.y - camera_y) * scale)),
+                           round(self.size * scale))
 
 class TreasureChest(Discovery):
     """A treasure chest discovery"""
@@ -408,6 +916,8 @@ class AncientArtifact(Discovery):
             value=100
         )
 
+DISCOVERY_TYPES = [TreasureChest, SeaCreature, AncientArtifact]
+
 # Run the game
 if __name__ == "__main__":
     game = OceanGame()
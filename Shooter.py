@@ -1,6 +1,17 @@
 import pygame
 import random
 import math
+from itertools import islice
+
+import numpy as np
+
+from headless import LiveInput, ScriptedInput, use_dummy_drivers
+from pool import ObjectPool
+from profiler import FrameProfiler
+from flow_field import FlowField
+from game_loop import FixedStepLoop, lerp, step_scale
+from spatial_hash import SpatialHash
+from text_cache import TextCache
 
 # Constants
 SCREEN_WIDTH = 800
@@ -10,6 +21,11 @@ BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
+FPS = 60
+BULLET_RADIUS = 5
+MAX_SEPARATION_NEIGHBOURS = 4
+SHOP_FPS = 30  # Cap on shop redraws
+SHOP_IDLE_TIMEOUT = 1000  # Milliseconds the shop sleeps waiting for input
 
 class Player:
     def __init__(self):
@@ -30,48 +46,167 @@ class Player:
         }
         self.total_coins = 0
         self.coins = 0
+        self.prev_x = self.x
+        self.prev_y = self.y
 
-    def move(self, keys):
+    def move(self, keys, scale=1):
+        # speed is per FPS step; scale converts it to the game's step rate
+        self.prev_x, self.prev_y = self.x, self.y
+        speed = self.speed * scale
         if keys[pygame.K_a or pygame.K_LEFT] and self.x > self.radius:
-            self.x -= self.speed
+            self.x -= speed
         if keys[pygame.K_d or pygame.K_RIGHT] and self.x < SCREEN_WIDTH - self.radius:
-            self.x += self.speed
+            self.x += speed
         if keys[pygame.K_w or pygame.K_UP] and self.y > self.radius:
-            self.y -= self.speed
+            self.y -= speed
         if keys[pygame.K_s or pygame.K_DOWN] and self.y < SCREEN_HEIGHT - self.radius:
-            self.y += self.speed
+            self.y += speed
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.radius)
+    def draw(self, screen, alpha=1.0):
+        # Drawn alpha of the way through the last step
+        x = lerp(self.prev_x, self.x, alpha)
+        y = lerp(self.prev_y, self.y, alpha)
+        pygame.draw.circle(screen, WHITE, (int(x), int(y)), self.radius)
         # Health bar
         health_width = 50
         health_height = 5
-        health_x = self.x - health_width // 2
-        health_y = self.y - self.radius - 10
+        health_x = x - health_width // 2
+        health_y = y - self.radius - 10
         pygame.draw.rect(screen, RED, (health_x, health_y, health_width * (self.health / self.max_health), health_height))
 
-class Bullet:
-    def __init__(self, x, y, target_x, target_y, speed=10):
-        self.x = x
-        self.y = y
+class BulletPool:
+    # Structure-of-arrays bullet store; live bullets are kept packed in rows [0, count)
+    def __init__(self, capacity=256):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        # Rows are reused once bullets are culled: hits are spawns into a row
+        # used before, misses into a new one
+        self.hits = 0
+        self.misses = 0
+        self.high_water = 0  # Most bullets ever live at once
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity=None):
+        capacity = max(capacity or 0, len(self.x) * 2)
+        for name in ('x', 'y', 'dx', 'dy', 'alive'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+
+    def copy_from(self, other):
+        # Become a copy of another pool's live bullets, reusing the columns
+        count = other.count
+        if count > len(self.x):
+            self.grow(count)
+        for name in ('x', 'y', 'dx', 'dy', 'alive'):
+            getattr(self, name)[:count] = getattr(other, name)[:count]
+        self.count = count
+
+    def spawn(self, x, y, target_x, target_y, speed=10):
+        if self.count == len(self.x):
+            self.grow()
         angle = math.atan2(target_y - y, target_x - x)
-        self.dx = math.cos(angle) * speed
-        self.dy = math.sin(angle) * speed
-        self.radius = 5
-
-    def move(self):
-        self.x += self.dx
-        self.y += self.dy
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, (0,255,211), (int(self.x), int(self.y)), self.radius)
+        index = self.count
+        self.x[index] = x
+        self.y[index] = y
+        self.dx[index] = math.cos(angle) * speed
+        self.dy[index] = math.sin(angle) * speed
+        self.alive[index] = True
+        if index < self.high_water:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+
+    def describe(self):
+        return f"{self.count} live, {self.high_water} peak, {self.hits} hits, {self.misses} misses"
+
+    def compact(self):
+        n = self.count
+        alive = self.alive[:n]
+        kept = int(np.count_nonzero(alive))
+        if kept == n:
+            return
+        for column in (self.x, self.y, self.dx, self.dy):
+            column[:kept] = column[:n][alive]
+        self.alive[:kept] = True
+        self.alive[kept:n] = False
+        self.count = kept
 
-    def is_off_screen(self):
-        return (self.x < 0 or self.x > SCREEN_WIDTH or 
-                self.y < 0 or self.y > SCREEN_HEIGHT)
+    def update(self):
+        # Move every bullet and drop the ones that left the screen
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        x += self.dx[:n]
+        y += self.dy[:n]
+        self.alive[:n] = (x >= 0) & (x <= SCREEN_WIDTH) & (y >= 0) & (y <= SCREEN_HEIGHT)
+        self.compact()
+
+    def collide(self, xs, ys, radii):
+        # Return bullet hits per circle; each bullet is spent on the first circle it overlaps
+        circles = len(xs)
+        hits = np.zeros(circles, dtype=np.intp)
+        n = self.count
+        if n == 0 or circles == 0:
+            return hits
+
+        # Broad phase: sort bullets on x, so the candidates of each circle are
+        # the run of bullets within its reach on x (widened a pixel for rounding)
+        order = np.argsort(self.x[:n])
+        sorted_x = self.x[:n][order]
+        reach = radii + BULLET_RADIUS
+        first = np.searchsorted(sorted_x, xs - reach - 1)
+        counts = np.searchsorted(sorted_x, xs + reach + 1, side='right') - first
+        total = int(counts.sum())
+        if total == 0:
+            return hits
+
+        # Narrow phase on the candidate pairs only, listed circle by circle
+        circle = np.repeat(np.arange(circles), counts)
+        starts = np.cumsum(counts) - counts
+        bullet = order[np.repeat(first - starts, counts) + np.arange(total)]
+        offset_x = xs[circle] - self.x[bullet]
+        offset_y = ys[circle] - self.y[bullet]
+        overlap = offset_x * offset_x + offset_y * offset_y < reach[circle] * reach[circle]
+        if not overlap.any():
+            return hits
+
+        # A bullet over several circles hits the lowest numbered one
+        hit_by = np.full(n, circles)
+        np.minimum.at(hit_by, bullet[overlap], circle[overlap])
+        spent = hit_by < circles
+        hits = np.bincount(hit_by[spent], minlength=circles)
+        self.alive[:n] = ~spent
+        self.compact()
+        return hits
+
+    def draw(self, screen, alpha=1.0):
+        # Bullets fly straight, so the previous position is one step back
+        n = self.count
+        back = 1 - alpha
+        xs = (self.x[:n] - self.dx[:n] * back).astype(int).tolist()
+        ys = (self.y[:n] - self.dy[:n] * back).astype(int).tolist()
+        for x, y in zip(xs, ys):
+            pygame.draw.circle(screen, (0,255,211), (x, y), BULLET_RADIUS)
 
 class Enemy:
+    # Enemies are pooled, so all setup happens in reset, which a reused enemy goes through again
+    __slots__ = ('x', 'y', 'health', 'speed', 'damage', 'radius', 'player', 'prev_x', 'prev_y')
+
     def __init__(self, player, enemies):
+        self.reset(player, enemies)
+
+    def reset(self, player, enemies):
         # Spawn point selection
         side = random.randint(0, 3)
         if side == 0:  # Top
@@ -108,66 +243,115 @@ class Enemy:
             else:
                 self.x = -50
                 self.y = random.randint(0, SCREEN_HEIGHT)
-
-    def move(self, enemies):
-        # Update target to current player position
-        self.target_x = self.player.x
-        self.target_y = self.player.y
-        
-        # Recalculate angle and movement
-        angle = math.atan2(self.target_y - self.y, self.target_x - self.x)
-        dx = math.cos(angle) * self.speed
-        dy = math.sin(angle) * self.speed
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def move(self, grid, field, scale=1):
+        # speed is per FPS step; scale converts it to the game's step rate
+        self.prev_x, self.prev_y = self.x, self.y
+        speed = self.speed * scale
+
+        # Follow the flow field; inside the player's cell head straight for the player
+        dx, dy = field.direction(self.x, self.y)
+        if not (dx or dy):
+            to_x = self.player.x - self.x
+            to_y = self.player.y - self.y
+            distance = math.hypot(to_x, to_y)
+            if distance:
+                dx, dy = to_x / distance, to_y / distance
         
-        # Proposed new position
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Check collision with other enemies
-        collision = False
-        for enemy in enemies:
-            if enemy != self:
-                distance = math.sqrt((new_x - enemy.x)**2 + (new_y - enemy.y)**2)
-                if distance < self.radius * 2:
-                    collision = True
+        # Step along the field, then push apart from overlapping neighbours
+        # instead of freezing in place. The grid was built at the start of the
+        # frame, so widen the query by how far a neighbour may have moved since
+        new_x = self.x + dx * speed
+        new_y = self.y + dy * speed
+        min_distance = self.radius * 2
+        min_distance_sq = min_distance * min_distance
+        push_x = push_y = 0.0
+        pushes = 0
+        for enemy in grid.query(new_x, new_y, min_distance + speed):
+            if enemy is self:
+                continue
+            away_x = new_x - enemy.x
+            away_y = new_y - enemy.y
+            distance_sq = away_x * away_x + away_y * away_y
+            if distance_sq < min_distance_sq:
+                distance = math.sqrt(distance_sq)
+                if distance:
+                    # Resolve half the overlap; the neighbour resolves the other half
+                    correction = (min_distance - distance) / (2 * distance)
+                    push_x += away_x * correction
+                    push_y += away_y * correction
+                # A few neighbours are enough to steer; stop scanning dense crowds
+                pushes += 1
+                if pushes == MAX_SEPARATION_NEIGHBOURS:
                     break
         
-        # Move if no collision
-        if not collision:
-            self.x = new_x
-            self.y = new_y
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, RED, (int(self.x), int(self.y)), self.radius)
+        self.x = new_x + push_x
+        self.y = new_y + push_y
+
+class EnemyCopy:
+    # The part of an enemy that is drawn, copied into a snapshot
+    __slots__ = ('prev_x', 'prev_y', 'x', 'y', 'radius')
+
+class GameSnapshot:
+    # Render state of one simulation step, filled in by Game.capture and
+    # drawn while the simulation thread moves on to the next step. A live
+    # snapshot refers to the game's own player, bullets and enemies
+    # instead, for drawing on the simulation's thread without copying
+    def __init__(self, live=False):
+        self.live = live
+        self.time = 0.0
+        self.player = None if live else Player()
+        self.bullets = None if live else BulletPool()
+        self.enemies = []  # The first enemy_rows are drawn; copies are reused from step to step
+        self.enemy_rows = 0
+        self.wave = 1
+        self.enemy_count = 0
 
 class Shop:
-    def __init__(self, player):
+    def __init__(self, player, text=None):
         self.player = player
+        self.text = text or TextCache()
         self.upgrades = {
             'Health Upgrade': {'cost': 50, 'stat': 'health', 'increase': 10},
             'Damage Upgrade': {'cost': 50, 'stat': 'damage', 'increase': 2},
             'Speed Upgrade': {'cost': 50, 'stat': 'speed', 'increase': 1},
             'Fire Rate Upgrade': {'cost': 50, 'stat': 'fire_rate', 'increase': -100}
         }
+        self.keys = {
+            pygame.K_1: 'Health Upgrade',
+            pygame.K_2: 'Damage Upgrade',
+            pygame.K_3: 'Speed Upgrade',
+            pygame.K_4: 'Fire Rate Upgrade'
+        }
 
     def draw(self, screen):
         screen.fill(BLACK)
-        font = pygame.font.Font(None, 36)
-        title = font.render("SHOP", True, WHITE)
+        font = self.text.font(36)
+        title = self.text.render(font, "SHOP", WHITE)
         screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
 
-        coins_text = font.render(f"Total Coins: {self.player.total_coins}", True, WHITE)
-        screen.blit(coins_text, (50, 100))
+        self.draw_stats(screen)
+
+        instruction_text = self.text.render(font, "Press number keys (1-4) to upgrade, SPACE to continue", WHITE)
+        screen.blit(instruction_text, (50, SCREEN_HEIGHT - 100))
 
+    def draw_stats(self, screen):
+        # Redraw only the lines a purchase can change and return their rects
+        font = self.text.font(36)
+        rows = [("Total Coins: ", self.player.total_coins, 100)]
         for i, (name, upgrade) in enumerate(self.upgrades.items()):
-            text = font.render(
-                f"{name} (Cost: {upgrade['cost']}) - Current Level: {self.player.upgrades[upgrade['stat']]}",
-                True, WHITE
-            )
-            screen.blit(text, (50, 200 + i * 50))
+            rows.append((f"{name} (Cost: {upgrade['cost']}) - Current Level: ",
+                         self.player.upgrades[upgrade['stat']], 200 + i * 50))
 
-        instruction_text = font.render("Press number keys (1-4) to upgrade, SPACE to continue", True, WHITE)
-        screen.blit(instruction_text, (50, SCREEN_HEIGHT - 100))
+        dirty = []
+        for label, value, y in rows:
+            row = pygame.Rect(50, y, SCREEN_WIDTH - 50, font.get_linesize())
+            screen.fill(BLACK, row)
+            self.text.draw_number(screen, font, label, value, WHITE, row.topleft)
+            dirty.append(row)
+        return dirty
 
     def handle_purchase(self, upgrade_name):
         upgrade = self.upgrades[upgrade_name]
@@ -187,167 +371,282 @@ class Shop:
                 self.player.fire_rate = max(100, self.player.fire_rate + upgrade['increase'])
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, input_source=None, shop_policy=None, threaded=False,
+                 step_rate=FPS, render_rate=FPS):
+        # Headless games open no window, skip drawing and read scripted input;
+        # a shop_policy(shop) callable replaces the scripted shop visit.
+        # Threaded games simulate on a worker thread and draw snapshots of it.
+        # The simulation steps step_rate times a second and draws up to
+        # render_rate frames; speeds and contact damage are tuned per FPS
+        # step and scaled by step_scale
+        self.headless = headless
+        self.threaded = threaded
+        self.shop_policy = shop_policy
+        self.step_scale = step_scale(step_rate, FPS)
+        if headless:
+            use_dummy_drivers()
+            self.input = input_source or ScriptedInput(fps=step_rate)
+        else:
+            self.input = input_source or LiveInput(step_rate)
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Roguelike Shooter")
         self.clock = pygame.time.Clock()
+        self.profiler = FrameProfiler()
+        self.loop = FixedStepLoop(step_rate, render_rate, profiler=self.profiler)
         self.player = Player()
-        self.bullets = []
+        self.bullets = BulletPool()
         self.enemies = []
+        self.enemy_pool = ObjectPool(Enemy)
+        self.enemy_grid = SpatialHash(32)
+        self.flow_field = FlowField(SCREEN_WIDTH, SCREEN_HEIGHT)
         self.running = True
         self.wave = 1
         self.enemy_count = 0
         self.max_enemies = 5
-        self.font = pygame.font.Font(None, 36)
+        self.text = TextCache()
+        self.font = self.text.font(36)
+        self.overlay_font = self.text.font(20)
         self.game_continues = True
+        self.snapshot = GameSnapshot(live=True)
 
     def spawn_enemies(self):
         while len(self.enemies) < self.max_enemies:
-            new_enemy = Enemy(self.player, self.enemies)
+            new_enemy = self.enemy_pool.acquire(self.player, self.enemies)
             self.enemies.append(new_enemy)
             self.enemy_count += 1
 
     def handle_events(self):
-        for event in pygame.event.get():
+        events = [] if self.headless else self.loop.events()
+        self.input.advance(events)
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
                 return
+            self.profiler.handle_event(event)
         
         # Continuous aiming and shooting
-        current_time = pygame.time.get_ticks()
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        current_time = self.input.get_ticks()
+        mouse_x, mouse_y = self.input.get_mouse_pos()
         
         if current_time - self.player.last_shot > self.player.fire_rate:
-            self.bullets.append(Bullet(self.player.x, self.player.y, mouse_x, mouse_y))
+            self.bullets.spawn(self.player.x, self.player.y, mouse_x, mouse_y, speed=10 * self.step_scale)
             self.player.last_shot = current_time
 
     def update(self):
-        keys = pygame.key.get_pressed()
-        self.player.move(keys)
-
-        # Move bullets
-        for bullet in self.bullets[:]:
-            bullet.move()
-            if bullet.is_off_screen():
-                self.bullets.remove(bullet)
-
-        # Move and check enemy interactions
-        for enemy in self.enemies[:]:
-            enemy.move(self.enemies)
-
-            # Check bullet collisions
-            for bullet in self.bullets[:]:
-                distance = math.sqrt((enemy.x - bullet.x)**2 + (enemy.y - bullet.y)**2)
-                if distance < enemy.radius + bullet.radius:
-                    enemy.health -= self.player.damage
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
+        keys = self.input.get_pressed()
+        self.player.move(keys, self.step_scale)
+
+        # Move bullets and cull the ones off screen in one batch
+        self.bullets.update()
+
+        # Broad phase: bucket enemies once per frame, and re-aim the flow
+        # field if the player moved to another cell
+        self.enemy_grid.rebuild(self.enemies)
+        self.flow_field.update(self.player.x, self.player.y)
+
+        # Move enemies
+        with self.profiler.section('Enemy.move'):
+            for enemy in self.enemies:
+                enemy.move(self.enemy_grid, self.flow_field, self.step_scale)
+
+        # Check bullet collisions for every enemy at once
+        enemy_x = np.fromiter((enemy.x for enemy in self.enemies), float, len(self.enemies))
+        enemy_y = np.fromiter((enemy.y for enemy in self.enemies), float, len(self.enemies))
+        enemy_radius = np.fromiter((enemy.radius for enemy in self.enemies), float, len(self.enemies))
+        bullet_hits = self.bullets.collide(enemy_x, enemy_y, enemy_radius)
+
+        survivors = []
+        for enemy, hits in zip(self.enemies, bullet_hits.tolist()):
+            enemy.health -= hits * self.player.damage
 
             # Check enemy-player collision
-            player_distance = math.sqrt((enemy.x - self.player.x)**2 + (enemy.y - self.player.y)**2)
-            if player_distance < enemy.radius + self.player.radius:
-                self.player.health -= enemy.damage
+            hit_distance = enemy.radius + self.player.radius
+            if (enemy.x - self.player.x)**2 + (enemy.y - self.player.y)**2 < hit_distance * hit_distance:
+                self.player.health -= enemy.damage * self.step_scale
 
             # Remove dead enemies
             if enemy.health <= 0:
-                
-                self.enemies.remove(enemy)
                 self.player.coins += 10
                 self.player.total_coins += 10
                 self.enemy_count -= 1
+                self.enemy_pool.release(enemy)
+            else:
+                survivors.append(enemy)
+        self.enemies = survivors
 
-        # Check wave completion and player health
+        # Check wave completion and player health. The shop and game over
+        # screens own the display, so they run on the main thread
         if not self.enemies:
-            self.enter_shop()
+            self.loop.on_main_thread(self.enter_shop)
             self.wave += 1
             self.max_enemies += 2
             self.spawn_enemies()
 
         # Check game over
         if self.player.health <= 0:
-            self.game_over()
+            self.loop.on_main_thread(self.game_over)
 
     def enter_shop(self):
         # Reset current wave coins and enter shop
         self.player.coins = 0
-        shop = Shop(self.player)
+        shop = Shop(self.player, self.text)
+
+        # A headless shop visit is either the shop policy or one input frame
+        # whose key presses are applied in order
+        if self.headless:
+            if self.shop_policy:
+                self.shop_policy(shop)
+                return
+            self.input.advance([])
+            for key in self.input.key_downs:
+                if key in shop.keys:
+                    shop.handle_purchase(shop.keys[key])
+            return
+
+        # Sleep until the player does something instead of redrawing every
+        # frame, collecting garbage while they read the shop
+        shop.draw(self.screen)
+        pygame.display.flip()
+        self.loop.collect_garbage()
+        purchases = []
         shop_active = True
         while shop_active:
-            for event in pygame.event.get():
+            events = [pygame.event.wait(SHOP_IDLE_TIMEOUT)] + pygame.event.get()
+            dirty = []
+            for event in events:
                 if event.type == pygame.QUIT:
                     shop_active = False
                     self.running = False
                     return
                 
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_1:
-                        shop.handle_purchase('Health Upgrade')
-                    elif event.key == pygame.K_2:
-                        shop.handle_purchase('Damage Upgrade')
-                    elif event.key == pygame.K_3:
-                        shop.handle_purchase('Speed Upgrade')
-                    elif event.key == pygame.K_4:
-                        shop.handle_purchase('Fire Rate Upgrade')
+                    if event.key in shop.keys:
+                        shop.handle_purchase(shop.keys[event.key])
+                        purchases.append(event)
+                        dirty = shop.draw_stats(self.screen)
                     elif event.key == pygame.K_SPACE:
                         shop_active = False
+                
+                # The window contents were lost, so repaint everything
+                if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    shop.draw(self.screen)
+                    dirty = [self.screen.get_rect()]
             
-            shop.draw(self.screen)
-            pygame.display.flip()
-
-    def draw(self):
+            if dirty:
+                pygame.display.update(dirty)
+            self.clock.tick(SHOP_FPS)
+
+        # Time spent shopping must not be simulated as catch-up steps
+        self.loop.resync()
+
+        # Hand the visit to the input source as one frame of key presses,
+        # which is exactly what a headless visit replays
+        self.input.advance(purchases)
+
+    def capture(self, snapshot):
+        # Copy what draw needs into a snapshot
+        snapshot.enemy_rows = len(self.enemies)
+        if snapshot.live:
+            snapshot.player = self.player
+            snapshot.bullets = self.bullets
+            snapshot.enemies = self.enemies
+        else:
+            player = snapshot.player
+            player.x = self.player.x
+            player.y = self.player.y
+            player.prev_x = self.player.prev_x
+            player.prev_y = self.player.prev_y
+            player.health = self.player.health
+            player.max_health = self.player.max_health
+            player.coins = self.player.coins
+            player.total_coins = self.player.total_coins
+            snapshot.bullets.copy_from(self.bullets)
+            copies = snapshot.enemies
+            while len(copies) < len(self.enemies):
+                copies.append(EnemyCopy())
+            for copy, enemy in zip(copies, self.enemies):
+                copy.prev_x = enemy.prev_x
+                copy.prev_y = enemy.prev_y
+                copy.x = enemy.x
+                copy.y = enemy.y
+                copy.radius = enemy.radius
+        snapshot.wave = self.wave
+        snapshot.enemy_count = self.enemy_count
+        return snapshot
+
+    def draw(self, alpha=1.0, snapshot=None):
+        # Everything is drawn from a snapshot, by default referring to the current state
+        if snapshot is None:
+            snapshot = self.capture(self.snapshot)
+        player = snapshot.player
         self.screen.fill(BLACK)
         
         # Draw player
-        self.player.draw(self.screen)
+        player.draw(self.screen, alpha)
         
         # Draw bullets
-        for bullet in self.bullets:
-            bullet.draw(self.screen)
+        snapshot.bullets.draw(self.screen, alpha)
         
         # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
+        for enemy in islice(snapshot.enemies, snapshot.enemy_rows):
+            x = lerp(enemy.prev_x, enemy.x, alpha)
+            y = lerp(enemy.prev_y, enemy.y, alpha)
+            pygame.draw.circle(self.screen, RED, (int(x), int(y)), enemy.radius)
         
         # Draw game info
-        wave_text = self.font.render(f"Wave: {self.wave}", True, WHITE)
-        enemy_text = self.font.render(f"Enemies: {self.enemy_count}", True, WHITE)
-        coins_text = self.font.render(f"Wave Coins: {self.player.coins}", True, WHITE)
-        total_coins_text = self.font.render(f"Total Coins: {self.player.total_coins}", True, WHITE)
-        
-        self.screen.blit(wave_text, (10, 10))
-        self.screen.blit(enemy_text, (10, 50))
-        self.screen.blit(coins_text, (10, 90))
-        self.screen.blit(total_coins_text, (10, 130))
+        self.text.draw_number(self.screen, self.font, "Wave: ", snapshot.wave, WHITE, (10, 10))
+        self.text.draw_number(self.screen, self.font, "Enemies: ", snapshot.enemy_count, WHITE, (10, 50))
+        self.text.draw_number(self.screen, self.font, "Wave Coins: ", player.coins, WHITE, (10, 90))
+        self.text.draw_number(self.screen, self.font, "Total Coins: ", player.total_coins, WHITE, (10, 130))
+        self.profiler.draw_overlay(self.screen, self.text, self.overlay_font)
 
-        pygame.display.flip()
+        with self.profiler.section('display.flip'):
+            pygame.display.flip()
 
     def game_over(self):
+        if self.headless:
+            self.running = False
+            return
+
         self.screen.fill(BLACK)
-        game_over_text = self.font.render("GAME OVER", True, RED)
-        wave_text = self.font.render(f"Waves Survived: {self.wave}", True, WHITE)
-        coins_text = self.font.render(f"Total Coins Earned: {self.player.total_coins}", True, WHITE)
+        game_over_text = self.text.render(self.font, "GAME OVER", RED)
+        wave_text = self.text.render(self.font, f"Waves Survived: {self.wave}", WHITE)
+        coins_text = self.text.render(self.font, f"Total Coins Earned: {self.player.total_coins}", WHITE)
         
         self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 100))
         self.screen.blit(wave_text, (SCREEN_WIDTH // 2 - wave_text.get_width() // 2, SCREEN_HEIGHT // 2))
         self.screen.blit(coins_text, (SCREEN_WIDTH // 2 - coins_text.get_width() // 2, SCREEN_HEIGHT // 2 + 50))
         
         pygame.display.flip()
+        self.loop.collect_garbage()
         pygame.time.wait(3000)
         self.running = False
 
-    def run(self):
+    def run(self, max_frames=None):
         # First wave preparation
         self.spawn_enemies()
         self.enter_shop()
         
-        # Main game loop
-        while self.running:
+        # Main game loop: fixed simulation steps, drawing in between;
+        # stops early after max_frames steps or when scripted input runs out
+        if self.threaded and not self.headless:
+            self.loop.run_threaded(self.step, self.capture, self.draw, self.is_running, GameSnapshot, max_frames)
+        else:
+            self.loop.run(self.step, self.draw, self.is_running, max_frames, self.headless)
+        pygame.quit()
+
+    def step(self):
+        with self.profiler.section('handle_events'):
             self.handle_events()
+        with self.profiler.section('update'):
             self.update()
-            self.draw()
-            self.clock.tick(60)
-        pygame.quit()
+        if self.profiler.show_overlay:
+            self.profiler.note('enemy pool', self.enemy_pool.describe())
+            self.profiler.note('bullets', self.bullets.describe())
+
+    def is_running(self):
+        return self.running and not self.input.finished
 
 def main():
     game = Game()
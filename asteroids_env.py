@@ -0,0 +1,156 @@
+import numpy as np
+import pygame
+
+from Asteroids import ASTEROID_SIZE, ASTEROID_SPEED, BLACK, SCREEN_HEIGHT, SCREEN_WIDTH, WHITE, AsteroidManager, Player
+
+# Actions
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+
+
+class AsteroidsBatchEnv:
+    """
+    Gym-style batch environment running many Asteroid Dodger games at once.
+    Every game follows the rules of Asteroids.Game: the player moves along
+    the bottom, asteroids fall, one spawns every spawn_interval steps and
+    the game ends on the first rect overlap. All games live in NumPy
+    arrays, one row per game and a fixed number of asteroid slots per row,
+    and a step advances them all with a handful of whole-array operations.
+    Nothing is drawn unless render() is called.
+
+    Observations are float32 arrays of shape (num_envs, 1 + 4 * max_asteroids):
+    the player x followed by x, y, width and height of every asteroid slot,
+    all divided by the screen width or height; empty slots are zero.
+    Finished games are reset automatically, so the observation returned
+    for a game that just ended is the first one of its next episode.
+    """
+    def __init__(self, num_envs, max_asteroids=None, seed=None):
+        """
+        Create num_envs games with room for max_asteroids live asteroids
+        each; by default as many as the spawn rules can keep on screen.
+        """
+        player = Player()
+        self.num_envs = num_envs
+        self.player_y = player.y
+        self.player_width = player.width
+        self.player_height = player.height
+        self.player_speed = player.speed
+        self.player_start = player.x
+        self.spawn_interval = AsteroidManager().spawn_interval
+        if max_asteroids is None:
+            # Frames the slowest, tallest asteroid needs to fall off screen
+            lifetime = (SCREEN_HEIGHT + ASTEROID_SIZE[1]) // ASTEROID_SPEED[0] + 1
+            max_asteroids = -(-lifetime // self.spawn_interval)
+        self.max_asteroids = max_asteroids
+        self.rng = np.random.default_rng(seed)
+
+        # Game state is kept in the observation layout, in pixels. An empty
+        # slot is all zeros, and a zero-width rect never overlaps the player.
+        self.state = np.zeros((num_envs, 1 + 4 * max_asteroids), dtype=np.float32)
+        self.player_x = self.state[:, 0]
+        self.slots = self.state[:, 1:].reshape(num_envs, max_asteroids, 4)
+        self.x = self.slots[..., 0]
+        self.y = self.slots[..., 1]
+        self.width = self.slots[..., 2]
+        self.height = self.slots[..., 3]
+        self.speed = np.zeros((num_envs, max_asteroids), dtype=np.float32)
+        self.spawn_timer = np.zeros(num_envs, dtype=np.int32)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+
+        self.obs = np.zeros_like(self.state)
+        self.rewards = np.ones(num_envs, dtype=np.float32)
+        self.scale = np.array([SCREEN_WIDTH] + [SCREEN_WIDTH, SCREEN_HEIGHT] * 2 * max_asteroids, dtype=np.float32)
+
+    @property
+    def alive(self):
+        """Boolean (num_envs, max_asteroids) array of occupied asteroid slots"""
+        return self.width > 0
+
+    def reset(self, mask=None):
+        """Start new episodes, for every game or the games selected by a boolean mask"""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.state[mask] = 0
+        self.player_x[mask] = self.player_start
+        self.speed[mask] = 0
+        self.spawn_timer[mask] = 0
+        self.score[mask] = 0
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Advance every game by one frame. actions holds NOOP, LEFT or RIGHT
+        per game. Return (observations, rewards, dones, final_scores): the
+        reward is 1 per frame played, as the score counts, and final_scores
+        holds the score of each game that just ended (0 elsewhere).
+        """
+        actions = np.asarray(actions)
+
+        # Player movement, with the same edge checks as Player.update
+        speed = self.player_speed
+        x = self.player_x
+        x -= speed * ((actions == LEFT) & (x > 0))
+        x += speed * ((actions == RIGHT) & (x < SCREEN_WIDTH - self.player_width))
+
+        # Asteroids fall and leave through the bottom edge; empty slots have no speed
+        self.y += self.speed
+        gone = self.y > SCREEN_HEIGHT
+        if gone.any():
+            self.slots[gone] = 0
+            self.speed[gone] = 0
+
+        # Spawn into the first free slot of every game whose timer is due
+        self.spawn_timer += 1
+        due = self.spawn_timer >= self.spawn_interval
+        if due.any():
+            self.spawn(due)
+
+        # Game over on any rect overlap with the player (Rect.colliderect)
+        player_x = x[:, None]
+        overlap = self.y < self.player_y + self.player_height
+        overlap &= self.player_y < self.y + self.height
+        overlap &= self.x < player_x + self.player_width
+        overlap &= player_x < self.x + self.width
+        dones = overlap.any(axis=1)
+        self.score += 1
+
+        final_scores = np.where(dones, self.score, 0)
+        if dones.any():
+            self.reset(dones)
+        else:
+            self.observe()
+        return self.obs, self.rewards, dones, final_scores
+
+    def spawn(self, due):
+        """Spawn one asteroid in every game selected by due"""
+        self.spawn_timer[due] = 0
+        envs = np.flatnonzero(due)
+        free = self.width[envs] == 0
+        has_room = free.any(axis=1)
+        envs = envs[has_room]
+        slots = free[has_room].argmax(axis=1)
+        count = len(envs)
+
+        width = self.rng.integers(ASTEROID_SIZE[0], ASTEROID_SIZE[1], count, endpoint=True)
+        height = self.rng.integers(ASTEROID_SIZE[0], ASTEROID_SIZE[1], count, endpoint=True)
+        self.width[envs, slots] = width
+        self.height[envs, slots] = height
+        self.x[envs, slots] = self.rng.integers(0, SCREEN_WIDTH - width, endpoint=True)
+        self.y[envs, slots] = -height  # Start above the screen
+        self.speed[envs, slots] = self.rng.integers(ASTEROID_SPEED[0], ASTEROID_SPEED[1], count, endpoint=True)
+
+    def observe(self):
+        """Fill and return the observation array: the state scaled to the screen size"""
+        return np.divide(self.state, self.scale, out=self.obs)
+
+    def render(self, index=0, surface=None):
+        """Draw one game onto surface (a new screen-sized Surface by default) and return it"""
+        if surface is None:
+            surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        surface.fill(BLACK)
+        pygame.draw.rect(surface, WHITE, (int(self.player_x[index]), self.player_y,
+                                          self.player_width, self.player_height))
+        for x, y, width, height in self.slots[index][self.alive[index]].tolist():
+            pygame.draw.rect(surface, (200, 0, 0), (x, y, width, height))
+        return surface
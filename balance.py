@@ -0,0 +1,183 @@
+"""
+Batch balance simulator for the roguelike shooter.
+Plays many headless Shooter sessions across a process pool, each with its
+own seed and shop upgrade policy, and prints how far each policy gets.
+
+    python balance.py --sessions 64 --policies balanced damage-first
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from headless import InputFrame, ScriptedInput
+
+# Shop purchase orders; a policy buys round-robin through its list while it can afford to
+POLICIES = {
+    'none': [],
+    'balanced': ['Health Upgrade', 'Damage Upgrade', 'Speed Upgrade', 'Fire Rate Upgrade'],
+    'health-first': ['Health Upgrade'],
+    'damage-first': ['Damage Upgrade'],
+    'speed-first': ['Speed Upgrade'],
+    'fire-rate-first': ['Fire Rate Upgrade'],
+    'offense': ['Damage Upgrade', 'Fire Rate Upgrade'],
+    'defense': ['Health Upgrade', 'Speed Upgrade']
+}
+
+
+class UpgradePolicy:
+    """Shop policy buying upgrades round-robin from a fixed order"""
+    def __init__(self, order):
+        """Remember the purchase order"""
+        self.order = order
+        self.spent = 0
+
+    def __call__(self, shop):
+        """Spend the player's coins on the shop, following the order"""
+        if not self.order:
+            return
+        index = 0
+        while shop.player.total_coins >= shop.upgrades[self.order[index]]['cost']:
+            self.spent += shop.upgrades[self.order[index]]['cost']
+            shop.handle_purchase(self.order[index])
+            index = (index + 1) % len(self.order)
+
+
+class Autopilot:
+    """
+    Scripted player for headless sessions.
+    Aims at the nearest enemy and circles away from the crowd, steering
+    back to the middle of the arena before it gets cornered.
+    """
+    def __init__(self, danger_radius=200, wall_margin=80):
+        """Create a pilot; attach it to a game before the first frame"""
+        self.game = None
+        self.danger_radius = danger_radius
+        self.wall_margin = wall_margin
+
+    def __call__(self, frame):
+        """Return the input for one frame"""
+        game = self.game
+        player = game.player
+        if not game.enemies:
+            return InputFrame(frozenset(), (), (int(player.x), int(player.y) - 1))
+
+        # Sum repulsion from nearby enemies, stronger the closer they are
+        push_x = push_y = 0.0
+        nearest = None
+        nearest_distance = float("inf")
+        for enemy in game.enemies:
+            distance = math.hypot(enemy.x - player.x, enemy.y - player.y) or 1.0
+            if distance < nearest_distance:
+                nearest, nearest_distance = enemy, distance
+            if distance < self.danger_radius:
+                # Away from the enemy plus a sideways component so we orbit instead of backing into walls
+                weight = (self.danger_radius - distance) / (distance * self.danger_radius)
+                away_x = (player.x - enemy.x) * weight
+                away_y = (player.y - enemy.y) * weight
+                push_x += away_x - away_y
+                push_y += away_y + away_x
+
+        # Walls push back towards the middle of the arena
+        width, height = game.screen.get_size()
+        margin = self.wall_margin
+        push_x += 3 * (max(0, margin - player.x) - max(0, player.x - (width - margin))) / margin
+        push_y += 3 * (max(0, margin - player.y) - max(0, player.y - (height - margin))) / margin
+
+        # Player.move reads WASD
+        held = set()
+        if abs(push_x) > 0.05:
+            held.add(pygame.K_d if push_x > 0 else pygame.K_a)
+        if abs(push_y) > 0.05:
+            held.add(pygame.K_s if push_y > 0 else pygame.K_w)
+        return InputFrame(held, (), (int(nearest.x), int(nearest.y)))
+
+
+def play_session(task):
+    """Play one headless session and return its result row; runs in a worker process"""
+    policy_name, seed, max_frames = task
+    import Shooter
+
+    random.seed(seed)
+    pilot = Autopilot()
+    policy = UpgradePolicy(POLICIES[policy_name])
+    game = Shooter.Game(headless=True, input_source=ScriptedInput(pilot), shop_policy=policy)
+    pilot.game = game
+
+    game.spawn_enemies()
+    game.enter_shop()
+    wave_frames = []
+    wave = game.wave
+    wave_start = 0
+    frames = 0
+    start = time.perf_counter()
+    while game.running and frames < max_frames:
+        game.handle_events()
+        game.update()
+        frames += 1
+        if game.wave != wave:
+            wave_frames.append(frames - wave_start)
+            wave = game.wave
+            wave_start = frames
+    elapsed = time.perf_counter() - start
+
+    return {
+        'policy': policy_name,
+        'seed': seed,
+        'waves': len(wave_frames),
+        'coins': game.player.total_coins + policy.spent,
+        'frames': frames,
+        'frames_per_wave': statistics.mean(wave_frames) if wave_frames else float(frames),
+        'seconds': elapsed
+    }
+
+
+def summarize(rows):
+    """Aggregate result rows into one line per policy"""
+    table = {}
+    for row in rows:
+        table.setdefault(row['policy'], []).append(row)
+    lines = [f"{'policy':<16} {'runs':>5} {'waves':>7} {'max':>4} {'coins':>8} {'frames/wave':>12} {'ms/wave':>8}"]
+    for policy, runs in sorted(table.items(), key=lambda item: -statistics.mean(r['waves'] for r in item[1])):
+        waves = [r['waves'] for r in runs]
+        total_waves = max(1, sum(waves))
+        ms_per_wave = sum(r['seconds'] for r in runs) * 1000 / total_waves
+        lines.append(
+            f"{policy:<16} {len(runs):>5} {statistics.mean(waves):>7.2f} {max(waves):>4} "
+            f"{statistics.mean(r['coins'] for r in runs):>8.0f} "
+            f"{statistics.mean(r['frames_per_wave'] for r in runs):>12.0f} {ms_per_wave:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=16, help="sessions per policy")
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 10, help="frame cap per session")
+    parser.add_argument('--seed', type=int, default=0, help="first session seed")
+    args = parser.parse_args()
+
+    tasks = [(policy, args.seed + i, args.max_frames)
+             for policy in args.policies for i in range(args.sessions)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        rows = list(pool.map(play_session, tasks, chunksize=max(1, len(tasks) // (args.workers * 4))))
+    elapsed = time.perf_counter() - start
+
+    print(summarize(rows))
+    frames = sum(r['frames'] for r in rows)
+    print(f"\n{len(rows)} sessions, {frames} frames in {elapsed:.1f}s "
+          f"on {args.workers} workers ({frames / elapsed:,.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Environment steps per second of the Asteroid Dodger batch environment
+against batch size, with random actions.
+Run from the repository root: python -m benchmarks.asteroids_env
+"""
+import time
+
+import numpy as np
+
+from asteroids_env import AsteroidsBatchEnv
+
+BATCH_SIZES = [1, 64, 1024, 8192, 65536]
+STEPS = 200
+
+
+def main():
+    print(f"{'envs':>6} {'step us':>9} {'env steps/s':>13}")
+    for num_envs in BATCH_SIZES:
+        env = AsteroidsBatchEnv(num_envs, seed=0)
+        env.reset()
+        actions = np.random.default_rng(0).integers(0, 3, (STEPS, num_envs))
+        start = time.perf_counter()
+        for step in range(STEPS):
+            env.step(actions[step])
+        elapsed = time.perf_counter() - start
+        print(f"{num_envs:>6} {elapsed / STEPS * 1e6:>9.1f} {num_envs * STEPS / elapsed:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
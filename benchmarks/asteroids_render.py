@@ -0,0 +1,66 @@
+"""
+Asteroid Dodger draw() cost and bytes pushed to the display per frame,
+full-screen flips against dirty-rect updates, as asteroid density grows.
+Run from the repository root: python -m benchmarks.asteroids_render
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Asteroids
+from headless import InputFrame, ScriptedInput
+
+SPAWN_INTERVALS = [60, 20, 5, 1]
+WARMUP_FRAMES = 200
+FRAMES = 300
+
+
+def weave(frame):
+    """Sweep the player left and right so it is always moving"""
+    key = pygame.K_LEFT if frame // 90 % 2 else pygame.K_RIGHT
+    return InputFrame(frozenset([key]), (), (0, 0))
+
+
+def measure(spawn_interval, dirty_rects):
+    """Return (draw ms, bytes pushed) per frame and the live asteroid count"""
+    random.seed(0)
+    game = Asteroids.Game(input_source=ScriptedInput(weave), dirty_rects=dirty_rects)
+    game.asteroid_manager.spawn_interval = spawn_interval
+    bytes_per_pixel = game.screen.get_bytesize()
+
+    for _ in range(WARMUP_FRAMES):
+        game.handle_events()
+        game.update()
+        game.game_over = False  # Keep game over out of the timing
+        game.draw()
+
+    draw_time = 0.0
+    pushed = 0
+    for _ in range(FRAMES):
+        game.handle_events()
+        game.update()
+        game.game_over = False
+        start = time.perf_counter()
+        game.draw()
+        draw_time += time.perf_counter() - start
+        pushed += game.presented_area * bytes_per_pixel
+    asteroids = len(game.asteroid_manager.asteroids)
+    pygame.quit()
+    return draw_time * 1000 / FRAMES, pushed / FRAMES, asteroids
+
+
+def main():
+    print(f"{'spawn every':>11} {'asteroids':>9} {'mode':>6} {'draw ms':>8} {'KB pushed':>10}")
+    for interval in SPAWN_INTERVALS:
+        for dirty_rects in (False, True):
+            ms, pushed, asteroids = measure(interval, dirty_rects)
+            mode = 'dirty' if dirty_rects else 'flip'
+            print(f"{interval:>11} {asteroids:>9} {mode:>6} {ms:>8.3f} {pushed / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
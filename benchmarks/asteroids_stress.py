@@ -0,0 +1,99 @@
+"""
+Asteroid Dodger update() cost with thousands of live asteroids, comparing
+the original pass over asteroid objects (per-asteroid Rect building and
+list.remove()) with the whole-column one over the EntityStore rows.
+Run from the repository root: python -m benchmarks.asteroids_stress
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Asteroids
+
+ASTEROID_COUNTS = [100, 1000, 5000, 20000]
+FRAMES = 60
+SPAWN_HEIGHT = Asteroids.SCREEN_HEIGHT * 4  # How far above the screen asteroids start
+
+
+class LegacyAsteroid:
+    """The original asteroid object, kept here for comparison"""
+    def __init__(self, y=None):
+        """
+        Pick random properties the way AsteroidManager.spawn does, just
+        above the screen unless y is given
+        """
+        self.width = random.randint(*Asteroids.ASTEROID_SIZE)
+        self.height = random.randint(*Asteroids.ASTEROID_SIZE)
+        self.x = random.randint(0, Asteroids.SCREEN_WIDTH - self.width)
+        self.speed = random.randint(*Asteroids.ASTEROID_SPEED)
+        self.color = (random.randint(100, 255), 0, 0)
+        self.y = -self.height if y is None else y
+
+    def update(self):
+        """Move the asteroid downwards"""
+        self.y += self.speed
+
+    def is_off_screen(self):
+        """Check if asteroid has moved off the bottom of the screen"""
+        return self.y > Asteroids.SCREEN_HEIGHT
+
+
+def legacy_update(game):
+    """The original update pass: copy, list.remove() and two new Rects per asteroid"""
+    asteroids = game.legacy_asteroids
+    player = game.player
+    for asteroid in asteroids[:]:
+        asteroid.update()
+        if asteroid.is_off_screen():
+            asteroids.remove(asteroid)
+    for asteroid in asteroids:
+        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
+        asteroid_rect = pygame.Rect(asteroid.x, asteroid.y, asteroid.width, asteroid.height)
+        if player_rect.colliderect(asteroid_rect):
+            game.game_over = True
+    game.score += 1
+
+
+def build_game(count, legacy=False):
+    """
+    Create a game with count asteroids spread over the screen and above
+    it; with legacy, as LegacyAsteroid objects in game.legacy_asteroids
+    """
+    random.seed(0)
+    game = Asteroids.Game(headless=True)
+    # No new spawns; the pre-placed asteroids stream off the bottom edge
+    game.asteroid_manager.spawn_interval = 10 ** 9
+    game.legacy_asteroids = []
+    for _ in range(count):
+        y = random.randint(-SPAWN_HEIGHT, Asteroids.SCREEN_HEIGHT)
+        if legacy:
+            game.legacy_asteroids.append(LegacyAsteroid(y))
+        else:
+            game.asteroid_manager.spawn(y)
+    return game
+
+
+def time_update(count, update):
+    """Return the mean update time in milliseconds"""
+    game = build_game(count, legacy=update is legacy_update)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        update(game)
+        game.game_over = False  # Keep game over out of the timing
+    return (time.perf_counter() - start) * 1000 / FRAMES
+
+
+def main():
+    print(f"{'asteroids':>9} {'legacy ms':>10} {'store ms':>10} {'speedup':>8}")
+    for count in ASTEROID_COUNTS:
+        legacy_ms = time_update(count, legacy_update)
+        store_ms = time_update(count, Asteroids.Game.update)
+        print(f"{count:>9} {legacy_ms:>10.3f} {store_ms:>10.3f} {legacy_ms / store_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Checks the store's handles and free list, then compares the memory per
+entity and update cost of entities as Python objects against the same
+entities as rows of an EntityStore: Asteroids' falling asteroids, as
+the original objects against the real AsteroidManager (move, cull and
+respawn off-screen ones), and Ocean's discoveries (the diver's reach
+test) with their own declared columns. Shooter's enemies are left out:
+their separation steering reads neighbours one after another as they
+move, which whole-column updates cannot reproduce.
+Run from the repository root: python -m benchmarks.entity_store
+"""
+import os
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+import Asteroids
+import Ocean
+from benchmarks.asteroids_stress import LegacyAsteroid
+from entity_store import COLOR, POSITION, EntityStore
+
+COUNTS = [100, 1000, 10000]
+STEPS = 100
+DISCOVERY_COMPONENTS = POSITION + (('size', np.int32), ('value', np.int32)) + COLOR
+
+
+def measure(build):
+    """Return what build() returns and the bytes it left allocated"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def per_step_ms(update):
+    """Return mean milliseconds of STEPS calls of update()"""
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        update()
+    return (time.perf_counter() - start) * 1000 / STEPS
+
+
+def check_handles():
+    """Check that destroyed handles go stale and stay stale once their row is reused"""
+    store = EntityStore(POSITION, capacity=2)
+    first = store.create(x=1, y=2)
+    second = store.create(x=3, y=4)
+    assert first in store and store.row(second) == 1 and store.prev_x[0] == 1
+
+    store.destroy(first)
+    assert first not in store and second in store and len(store) == 1
+    reused = store.create(x=5)
+    assert store.row(reused) == 0 and reused != first and first not in store
+    try:
+        store.destroy(first)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("a stale handle destroyed a live entity")
+
+    # Growing past the capacity keeps rows and handles
+    third = store.create(x=6)
+    assert store.capacity >= 3 and store.x[1] == 3 and second in store and store.row(third) == 2
+
+    # Bulk removal frees rows for reuse in last in, first out order
+    assert store.destroy_where(store.x[:store.end] > 4).tolist() == [0, 2]
+    assert reused not in store and third not in store and len(store) == 1
+    assert store.row(store.create()) == 2 and store.row(store.create()) == 0
+    assert store.end == 3
+
+
+def asteroids(count):
+    """Yield (layout, bytes, ms per step) for count asteroids"""
+    random.seed(0)
+
+    def build():
+        return [LegacyAsteroid(random.randint(-Asteroids.ASTEROID_SIZE[1], Asteroids.SCREEN_HEIGHT))
+                for _ in range(count)]
+    objects, size = measure(build)
+
+    def update():
+        for index, asteroid in enumerate(objects):
+            asteroid.update()
+            if asteroid.is_off_screen():
+                objects[index] = LegacyAsteroid()
+    yield "objects", size, per_step_ms(update)
+
+    def build():
+        manager = Asteroids.AsteroidManager()
+        manager.spawn_interval = 10 ** 9
+        manager.asteroids.reserve(count)
+        for _ in range(count):
+            manager.spawn(random.randint(-Asteroids.ASTEROID_SIZE[1], Asteroids.SCREEN_HEIGHT))
+        return manager
+    manager, size = measure(build)
+
+    def update():
+        live = len(manager.asteroids)
+        manager.update()
+        manager.removed.clear()  # Nothing is drawn, so nothing waits to be erased
+        for _ in range(live - len(manager.asteroids)):
+            manager.spawn()
+    yield "store", size, per_step_ms(update)
+
+
+def discoveries(count):
+    """Yield (layout, bytes, ms per step) for count discoveries tested against the diver"""
+    random.seed(0)
+    diver = Ocean.Diver()
+
+    def place():
+        return random.randint(0, Ocean.SCREEN_WIDTH), random.randint(0, 10 * Ocean.SCREEN_HEIGHT)
+    objects, size = measure(lambda: [random.choice(Ocean.DISCOVERY_TYPES)(*place()) for _ in range(count)])
+    yield "objects", size, per_step_ms(lambda: [d for d in objects if d.check_collision(diver)])
+
+    def build():
+        store = EntityStore(DISCOVERY_COMPONENTS, count)
+        for discovery in objects:
+            store.create(x=discovery.x, y=discovery.y, size=discovery.size, value=discovery.value,
+                         color=discovery.color)
+        return store
+    store, size = measure(build)
+
+    def update():
+        n = store.end
+        dx = store.x[:n] - diver.x
+        dy = store.y[:n] - diver.y
+        reach = store.size[:n] + max(diver.width, diver.height)
+        return np.flatnonzero((dx * dx + dy * dy < reach * reach) & store.alive[:n])
+    yield "store", size, per_step_ms(update)
+
+
+def main():
+    check_handles()
+    print("handles and free list: ok")
+    print(f"{'entities':<12} {'count':>6} {'layout':<8} {'bytes/entity':>13} {'update ms':>10}")
+    for name, workload in (("asteroids", asteroids), ("discoveries", discoveries)):
+        for count in COUNTS:
+            for layout, size, update_ms in workload(count):
+                print(f"{name:<12} {count:>6} {layout:<8} {size / count:>13.0f} {update_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
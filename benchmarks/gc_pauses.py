@@ -0,0 +1,89 @@
+"""
+Garbage collection pauses in a live Ocean run, with automatic collection
+against the loop's GCPolicy. Every step also builds some short-lived
+reference cycles, standing in for allocation-heavy game code. Pauses
+are split by where they landed: inside a step or draw (a frame spike)
+or in the idle time after a frame. Pauses are measured in process time,
+since collections are pure CPU work, so other load on the machine does
+not show up as collector time.
+Run from the repository root: python -m benchmarks.gc_pauses
+"""
+import gc
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Ocean
+
+STEPS = 600
+CYCLES = 200  # Reference cycles made garbage per step
+
+
+class Node:
+    """One half of a reference cycle"""
+    def __init__(self):
+        """Create a node with no partner"""
+        self.other = None
+
+
+def make_garbage():
+    """Build CYCLES two-node cycles and drop them"""
+    for _ in range(CYCLES):
+        a = Node()
+        b = Node()
+        a.other = b
+        b.other = a
+
+
+def time_run(manage_gc):
+    """Return the pause statistics of one live run"""
+    random.seed(0)
+    game = Ocean.OceanGame(seed=0, adaptive_quality=False)
+    if not manage_gc:
+        game.loop.gc_policy = None
+    in_frame = [False]
+    pauses = {True: [], False: []}
+    started = [0]
+
+    def on_collection(phase, info):
+        if phase == 'start':
+            started[0] = time.process_time_ns()
+        else:
+            pauses[in_frame[0]].append((time.process_time_ns() - started[0]) / 1e6)
+
+    def tracked(function):
+        def run(*args):
+            in_frame[0] = True
+            try:
+                function(*args)
+            finally:
+                in_frame[0] = False
+        return run
+
+    step = game.step
+    game.step = tracked(lambda: (step(), make_garbage()))
+    game.draw = tracked(game.draw)
+    gc.callbacks.append(on_collection)
+    try:
+        game.run(STEPS)
+    finally:
+        gc.callbacks.remove(on_collection)
+    pygame.quit()
+    return pauses[True], pauses[False]
+
+
+def main():
+    print(f"{'collection':<10} {'in frame':>9} {'worst ms':>9} {'total ms':>9} {'idle':>6} {'worst ms':>9} {'total ms':>9}")
+    for manage_gc in (False, True):
+        framed, idle = time_run(manage_gc)
+        name = "policy" if manage_gc else "automatic"
+        print(f"{name:<10} {len(framed):>9} {max(framed, default=0):>9.3f} {sum(framed):>9.2f} "
+              f"{len(idle):>6} {max(idle, default=0):>9.3f} {sum(idle):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Ocean static-layer cost: water gradient and wall polylines painted every
+frame against the pre-rendered background blitted once, with the camera
+scrolling down through the world (re-renders included).
+Run from the repository root: python -m benchmarks.ocean_background
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Ocean
+
+FRAMES = 600
+SCROLL_SPEED = 5  # Pixels per frame, the diver's speed
+
+
+def redrawn(ocean, screen, camera_y):
+    """Paint the water gradient and walls straight onto the screen every frame"""
+    ocean.render_static(screen, camera_y, 0, Ocean.SCREEN_HEIGHT)
+
+
+def cached(ocean, screen, camera_y):
+    """Blit the pre-rendered background (Ocean.draw without the bubbles)"""
+    first = camera_y // Ocean.CHUNK_HEIGHT
+    if first != ocean.background_chunk:
+        ocean.render_background(first)
+    screen.blit(ocean.background, (0, 0),
+                (0, camera_y - first * Ocean.CHUNK_HEIGHT, Ocean.SCREEN_WIDTH, Ocean.SCREEN_HEIGHT))
+
+
+def time_frames(screen, background):
+    """Return mean milliseconds per frame of one static-layer pass"""
+    ocean = Ocean.Ocean(bubble_count=0, seed=0)
+    elapsed = 0
+    for frame in range(FRAMES):
+        camera_y = frame * SCROLL_SPEED
+        ocean.scroll(camera_y)
+        start = time.perf_counter()
+        background(ocean, screen, camera_y)
+        elapsed += time.perf_counter() - start
+    return elapsed * 1000 / FRAMES
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((Ocean.SCREEN_WIDTH, Ocean.SCREEN_HEIGHT))
+    rows = [("redrawn", time_frames(screen, redrawn)),
+            ("pre-rendered", time_frames(screen, cached))]
+    print(f"{'background':<14} {'frame ms':>9}")
+    for name, frame_ms in rows:
+        print(f"{name:<14} {frame_ms:>9.3f}")
+    print(f"speedup: {rows[0][1] / rows[1][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
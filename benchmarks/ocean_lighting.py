@@ -0,0 +1,59 @@
+"""
+Ocean lighting cost: per-frame circle stacking against the cached light mask.
+Run from the repository root: python -m benchmarks.ocean_lighting
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Ocean
+
+FRAMES = 200
+
+
+def stacked_circles(game):
+    """The original lighting pass: full-screen overlay rebuilt every frame"""
+    light_surface = game.legacy_light_surface
+    light_surface.fill(Ocean.LIGHT_DARKNESS)
+    for r in range(game.light_radius, 0, -10):
+        alpha = int(255 * (r / game.light_radius) ** 2)
+        pygame.draw.circle(light_surface, (255, 255, 255, alpha),
+                           (int(game.diver.x), int(game.diver.y)), r)
+    game.screen.blit(light_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+
+def time_frames(game, lighting):
+    """Return mean milliseconds of the lighting pass alone and of a full draw() using it"""
+    game.create_lighting_effect = lambda *args: lighting(game)
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        game.diver.x = 100 + (frame * 7) % (Ocean.SCREEN_WIDTH - 200)
+        lighting(game)
+    lighting_ms = (time.perf_counter() - start) * 1000 / FRAMES
+
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        game.diver.x = 100 + (frame * 7) % (Ocean.SCREEN_WIDTH - 200)
+        game.draw()
+    frame_ms = (time.perf_counter() - start) * 1000 / FRAMES
+    return lighting_ms, frame_ms
+
+
+def main():
+    game = Ocean.OceanGame()
+    game.legacy_light_surface = pygame.Surface((Ocean.SCREEN_WIDTH, Ocean.SCREEN_HEIGHT), pygame.SRCALPHA)
+    cached = Ocean.OceanGame.create_lighting_effect
+
+    rows = [("stacked circles", time_frames(game, stacked_circles)),
+            ("cached mask", time_frames(game, cached))]
+    print(f"{'lighting':<16} {'light ms':>9} {'frame ms':>9}")
+    for name, (lighting_ms, frame_ms) in rows:
+        print(f"{name:<16} {lighting_ms:>9.3f} {frame_ms:>9.3f}")
+    print(f"frame speedup: {rows[0][1][1] / rows[1][1][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Ocean bubble update and draw cost against particle count, for regular
+bubbles (sprites of size 2-10) and a dense field of size-1 points.
+Run from the repository root: python -m benchmarks.ocean_particles
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Ocean
+
+PARTICLE_COUNTS = [50, 1000, 10000, 100000]
+FRAMES = 60
+
+
+def main():
+    random.seed(0)
+    pygame.init()
+    screen = pygame.display.set_mode((Ocean.SCREEN_WIDTH, Ocean.SCREEN_HEIGHT))
+    print(f"{'field':<8} {'count':>7} {'update ms':>10} {'draw ms':>9} {'fps':>7}")
+    for field in ('bubbles', 'points'):
+        for count in PARTICLE_COUNTS:
+            time_field(screen, field, count)
+
+
+def time_field(screen, field, count):
+    """Time update() and draw() for one particle field"""
+    if field == 'bubbles':
+        ocean = Ocean.Ocean(bubble_count=count)
+    else:
+        ocean = Ocean.Ocean(bubble_count=0)
+        rng = ocean.bubbles.rng
+        ocean.bubbles.emit(
+            count,
+            x=rng.uniform(0, Ocean.SCREEN_WIDTH, count),
+            y=rng.uniform(0, Ocean.SCREEN_HEIGHT, count),
+            vx=0,
+            vy=-rng.uniform(0.5, 2, count),
+            size=1
+        )
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        ocean.update()
+    update_ms = (time.perf_counter() - start) * 1000 / FRAMES
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        ocean.bubbles.draw(screen)
+    draw_ms = (time.perf_counter() - start) * 1000 / FRAMES
+
+    print(f"{field:<8} {count:>7} {update_ms:>10.3f} {draw_ms:>9.3f} {1000 / (update_ms + draw_ms):>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
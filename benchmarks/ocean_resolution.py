@@ -0,0 +1,56 @@
+"""
+Ocean frame cost at reduced internal resolution: the scene drawn at a
+fraction of the window size and scaled up once per frame, against the
+native-resolution draw. The HUD is drawn at native resolution throughout.
+Run from the repository root: python -m benchmarks.ocean_resolution
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Ocean
+
+FRAMES = 200
+SCALES = [1, 2 / 3, 1 / 2]
+BUBBLES = 2000
+
+
+def time_draw(scale, smooth):
+    """Return mean milliseconds of draw() and of its scaling pass alone"""
+    random.seed(0)
+    game = Ocean.OceanGame(adaptive_quality=False, render_scale=scale, smooth_scaling=smooth)
+    game.ocean = Ocean.Ocean(bubble_count=BUBBLES, seed=game.seed)
+    game.light_radius = 400
+    for _ in range(10):
+        game.draw()
+
+    scaling = game.profiler.section('scale_scene')
+    scaling_ns = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        game.diver.y = frame * 5
+        game.follow_diver()
+        game.draw()
+        scaling_ns += scaling.last
+    frame_ms = (time.perf_counter() - start) * 1000 / FRAMES
+    pygame.quit()
+    return frame_ms, scaling_ns / 1e6 / FRAMES
+
+
+def main():
+    print(f"{'scale':>6} {'filter':<12} {'draw ms':>8} {'scale ms':>9} {'speedup':>8}")
+    native = None
+    for scale in SCALES:
+        for smooth in ((False,) if scale == 1 else (False, True)):
+            frame_ms, scaling_ms = time_draw(scale, smooth)
+            native = native or frame_ms
+            name = "smoothscale" if smooth else "scale"
+            print(f"{scale:>6.2f} {name:<12} {frame_ms:>8.3f} {scaling_ms:>9.3f} {native / frame_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
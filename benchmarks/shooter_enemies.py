@@ -0,0 +1,88 @@
+"""
+Shooter update() time against enemy and bullet count, with the player
+walking across the screen so the flow field is rebuilt whenever it
+enters a new cell, as in play, and the cost of one rebuild on its own.
+Run from the repository root: python -m benchmarks.shooter_enemies
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import Shooter
+
+ENEMY_COUNTS = [10, 50, 100, 200, 400, 800]
+BULLET_COUNT = 50
+BULLET_COUNTS = [100, 1000, 5000, 20000]
+FRAMES = 120
+REBUILDS = 200
+
+
+def build_game(enemy_count, bullet_count=BULLET_COUNT):
+    """Create a game with enemy_count enemies and a spray of bullet_count bullets"""
+    game = Shooter.Game()
+    game.player.health = float("inf")  # Keep game over out of the timing
+    # Scatter enemies directly; spawn_enemies() only uses the screen edges
+    for _ in range(enemy_count):
+        enemy = Shooter.Enemy(game.player, [])
+        enemy.x = random.uniform(0, Shooter.SCREEN_WIDTH)
+        enemy.y = random.uniform(0, Shooter.SCREEN_HEIGHT)
+        enemy.health = float("inf")  # Keep the wave alive for every frame
+        game.enemies.append(enemy)
+    for _ in range(bullet_count):
+        game.bullets.spawn(
+            game.player.x, game.player.y,
+            random.randint(0, Shooter.SCREEN_WIDTH),
+            random.randint(0, Shooter.SCREEN_HEIGHT),
+            speed=0.5
+        )
+    return game
+
+
+def walk(game, frame):
+    """Move the player at its own speed along a zigzag over the screen"""
+    player = game.player
+    distance = frame * player.speed
+    player.x = distance % Shooter.SCREEN_WIDTH
+    player.y = (distance // Shooter.SCREEN_WIDTH * 97) % Shooter.SCREEN_HEIGHT
+
+
+def time_update(game, frames):
+    """Return the mean update() time in milliseconds"""
+    start = time.perf_counter()
+    for frame in range(frames):
+        walk(game, frame)
+        game.update()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def time_rebuild(game):
+    """Return the mean time of one flow field rebuild in milliseconds"""
+    field = game.flow_field
+    start = time.perf_counter()
+    for rebuild in range(REBUILDS):
+        field.goal = None  # Force a rebuild even if the goal stays in its cell
+        field.update(rebuild * 37 % Shooter.SCREEN_WIDTH, rebuild * 53 % Shooter.SCREEN_HEIGHT)
+    return (time.perf_counter() - start) * 1000 / REBUILDS
+
+
+def main():
+    random.seed(0)
+    print(f"{'enemies':>8} {'update ms':>10} {'fps budget':>11}")
+    for count in ENEMY_COUNTS:
+        game = build_game(count)
+        ms = time_update(game, FRAMES)
+        print(f"{count:>8} {ms:>10.3f} {ms / (1000 / 60) * 100:>10.1f}%")
+    print()
+    print(f"{'bullets':>8} {'update ms':>10} {'fps budget':>11}")
+    for count in BULLET_COUNTS:
+        game = build_game(50, count)
+        ms = time_update(game, FRAMES)
+        print(f"{count:>8} {ms:>10.3f} {ms / (1000 / 60) * 100:>10.1f}%")
+    print()
+    print(f"flow field rebuild: {time_rebuild(build_game(0)):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Headless benchmark suite for all three games.
+Every scenario is seeded and swept over entity counts; update() and
+draw() are timed separately per frame and reported as median and p99,
+together with how much memory each frame allocates: the peak traced by
+tracemalloc above the frame's starting point, measured in a separate
+pass so tracing does not slow the timed frames. Results are
+written as JSON so runs can be compared across commits.
+Run from the repository root:
+
+    python -m benchmarks.suite --out before.json
+    python -m benchmarks.suite --out after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Asteroids
+import Ocean
+from benchmarks import asteroids_stress, shooter_enemies
+
+WARMUP_FRAMES = 10
+ALLOCATION_FRAMES = 30  # Frames traced by tracemalloc after the timed ones
+
+
+def asteroids_game(count):
+    """Asteroid Dodger with count asteroids spread over and above the screen"""
+    game = asteroids_stress.build_game(count)
+    # Below the lowest row an asteroid reaches, to keep game over out of the timing
+    game.player.rect.y = Asteroids.SCREEN_HEIGHT + 100
+    return game
+
+
+def shooter_enemy_game(count):
+    """Shooter with count scattered, unkillable enemies"""
+    return shooter_enemies.build_game(count)
+
+
+def shooter_bullet_game(count):
+    """Shooter with 50 enemies and a slow spray of count bullets"""
+    return shooter_enemies.build_game(50, count)
+
+
+def ocean_bubble_game(count):
+    """Ocean with count bubbles"""
+    game = Ocean.OceanGame(headless=True)
+    game.ocean = Ocean.Ocean(bubble_count=count, seed=game.seed)
+    game.discovery_manager = Ocean.DiscoveryManager()
+    game.follow_diver()
+    game.diver.oxygen_drain_rate = 0  # Keep game over out of the timing
+    return game
+
+
+def ocean_discovery_game(count):
+    """Ocean with count discoveries scattered over the view"""
+    game = ocean_bubble_game(50)
+    top = game.ocean.camera_y
+    for _ in range(count):
+        discovery_class = random.choice(Ocean.DISCOVERY_TYPES)
+        game.discovery_manager.add(discovery_class(
+            random.randint(0, Ocean.SCREEN_WIDTH), random.randint(top, top + Ocean.SCREEN_HEIGHT)))
+    return game
+
+
+SCENARIOS = {
+    'asteroids': (asteroids_game, [10, 100, 1000, 5000]),
+    'shooter-enemies': (shooter_enemy_game, [10, 50, 200, 800]),
+    'shooter-bullets': (shooter_bullet_game, [100, 1000, 10000]),
+    'ocean-bubbles': (ocean_bubble_game, [50, 1000, 10000, 100000]),
+    'ocean-discoveries': (ocean_discovery_game, [10, 100, 1000])
+}
+
+
+def percentile(samples, fraction):
+    """Return the sample at a fraction of the sorted samples (nearest rank)"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples):
+    """Return median and p99 of nanosecond samples, in milliseconds"""
+    return {
+        'median_ms': percentile(samples, 0.5) / 1e6,
+        'p99_ms': percentile(samples, 0.99) / 1e6
+    }
+
+
+def measure(build, count, frames):
+    """Run one scenario at one entity count and return its result row"""
+    random.seed(0)
+    game = build(count)
+    for _ in range(WARMUP_FRAMES):
+        game.update()
+        game.draw()
+
+    update_times = []
+    draw_times = []
+    clock = time.perf_counter_ns
+    for _ in range(frames):
+        start = clock()
+        game.update()
+        middle = clock()
+        game.draw()
+        end = clock()
+        update_times.append(middle - start)
+        draw_times.append(end - middle)
+
+    # Memory allocated within each frame, even if it is freed again before the end
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(ALLOCATION_FRAMES):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        game.update()
+        game.draw()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    pygame.quit()
+
+    return {
+        'count': count,
+        'update': summarize(update_times),
+        'draw': summarize(draw_times),
+        'frame': summarize([u + d for u, d in zip(update_times, draw_times)]),
+        'allocated_kb_per_frame': allocated / 1024 / ALLOCATION_FRAMES
+    }
+
+
+def environment():
+    """Describe the machine and commit the results belong to"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def print_row(scenario, row, baseline=None):
+    """Print one result row, with the frame-time ratio to a baseline if given"""
+    line = (f"{scenario:<18} {row['count']:>7} "
+            f"{row['update']['median_ms']:>8.3f} {row['update']['p99_ms']:>8.3f} "
+            f"{row['draw']['median_ms']:>8.3f} {row['draw']['p99_ms']:>8.3f} "
+            f"{row['allocated_kb_per_frame']:>8.1f}")
+    if baseline:
+        line += f" {baseline['frame']['median_ms'] / row['frame']['median_ms']:>7.2f}x"
+    print(line)
+
+
+def load_baseline(path):
+    """Index a previous results file by scenario and count"""
+    with open(path) as f:
+        previous = json.load(f)
+    return {
+        (scenario, row['count']): row
+        for scenario, rows in previous['results'].items()
+        for row in rows
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite")
+    parser.add_argument('--frames', type=int, default=120, help="measured frames per run")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument('--out', help="write results to this JSON file")
+    parser.add_argument('--compare', help="show speedup against a previous results file")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.compare) if args.compare else {}
+    results = {}
+    print(f"{'scenario':<18} {'count':>7} {'upd med':>8} {'upd p99':>8} "
+          f"{'drw med':>8} {'drw p99':>8} {'alloc KB':>8}" + (f" {'speedup':>8}" if baseline else ""))
+    for scenario in args.scenario or SCENARIOS:
+        build, counts = SCENARIOS[scenario]
+        rows = results[scenario] = []
+        for count in counts:
+            row = measure(build, count, args.frames)
+            rows.append(row)
+            print_row(scenario, row, baseline.get((scenario, count)))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'environment': environment(), 'frames': args.frames, 'results': results}, f, indent=2)
+        print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
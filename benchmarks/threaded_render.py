@@ -0,0 +1,81 @@
+"""
+Live runs of Ocean with heavy lighting and of Shooter in a crowded late
+wave, with the simulation and drawing on one thread against the
+simulation on a worker thread drawing double-buffered snapshots. Frames
+are uncapped, so the frame rate shows how much drawing fits around the
+fixed 60 Hz simulation. Overlap is step plus draw time over wall time:
+above 1 the two ran in parallel, which needs more than one core and
+pygame releasing the GIL in its blits and fills.
+Run from the repository root: python -m benchmarks.threaded_render
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import Ocean
+import Shooter
+
+STEPS = 300
+BUBBLES = 2000
+ENEMIES = 60
+
+
+def ocean_game(threaded):
+    """Return an Ocean game with a large light and a dense bubble field"""
+    random.seed(0)
+    game = Ocean.OceanGame(seed=0, adaptive_quality=False, threaded=threaded)
+    game.ocean = Ocean.Ocean(bubble_count=BUBBLES, seed=game.seed)
+    game.follow_diver()
+    game.light_radius = 400
+    return game
+
+
+def shooter_game(threaded):
+    """Return a Shooter game in a late wave that neither ends nor kills the player"""
+    random.seed(0)
+    game = Shooter.Game(threaded=threaded)
+    game.enter_shop = lambda: None
+    game.max_enemies = ENEMIES
+    game.player.health = game.player.max_health = 10 ** 9
+    return game
+
+
+def time_run(make_game, threaded):
+    """Return steps/s, frames/s and the overlap ratio of one live run"""
+    game = make_game(threaded)
+    game.loop.render_rate = 0
+    busy = [0.0, 0.0]
+
+    def timed(function, slot):
+        def run(*args):
+            start = time.perf_counter()
+            function(*args)
+            busy[slot] += time.perf_counter() - start
+        return run
+
+    game.step = timed(game.step, 0)
+    game.draw = timed(game.draw, 1)
+    start = time.perf_counter()
+    game.run(STEPS)
+    wall = time.perf_counter() - start
+    steps, frames = game.loop.steps, game.loop.frames
+    pygame.quit()
+    return steps / wall, frames / wall, sum(busy) / wall
+
+
+def main():
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'game':<8} {'mode':<11} {'steps/s':>8} {'frames/s':>9} {'overlap':>8}")
+    for name, make_game in (("ocean", ocean_game), ("shooter", shooter_game)):
+        for threaded in (False, True):
+            steps, frames, overlap = time_run(make_game, threaded)
+            mode = "threaded" if threaded else "sequential"
+            print(f"{name:<8} {mode:<11} {steps:>8.1f} {frames:>9.1f} {overlap:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
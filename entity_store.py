@@ -0,0 +1,165 @@
+import numpy as np
+
+INDEX_BITS = 24  # Low bits of a handle are the row, the rest its generation
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+# Component columns as (name, type) or (name, type, width) for several values per row
+POSITION = (('x', np.float64), ('y', np.float64), ('prev_x', np.float64), ('prev_y', np.float64))
+VELOCITY = (('vx', np.float64), ('vy', np.float64))
+SIZE = (('width', np.int32), ('height', np.int32))
+COLOR = (('color', np.uint8, 3),)
+
+# Bookkeeping columns every store has
+BOOKKEEPING = (('alive', np.bool_), ('generation', np.uint32))
+
+
+class EntityStore:
+    """
+    Array-backed entity-component store.
+    Every entity is one row across typed, contiguous NumPy columns, one
+    per component the caller declares, e.g. POSITION + VELOCITY + SIZE
+    plus columns of its own. Systems are methods that work on whole
+    columns, so an update costs a handful of array operations however
+    many entities there are; each needs the columns it works on (move
+    needs position and velocity, overlapping position and size).
+    Rows are recycled through a free list, so create and destroy are
+    O(1) and rows never move. Entities are referred to by handles that
+    combine the row with a generation count bumped on every destroy; a
+    handle to a destroyed entity stays invalid after its row is reused.
+    Rows past the high-water mark and free rows hold zero velocity, so
+    systems can run over the slice [0, end) without masking.
+    As with ObjectPool, the counters show how well recycling covers the
+    churn: hits and misses are creates served from the free list and by
+    a new row, high_water is the most entities ever live at once.
+    """
+    def __init__(self, components, capacity=256):
+        """Create an empty store with the given component columns and room for capacity entities"""
+        self.components = tuple(components) + BOOKKEEPING
+        self.names = [component[0] for component in components]
+        for name, dtype, *width in self.components:
+            setattr(self, name, np.zeros((capacity, *width), dtype=dtype))
+        self.capacity = capacity
+        self.end = 0  # Rows below end have been used at least once
+        self.free = []  # Free rows below end, reused last in, first out
+        self.count = 0
+        self.hits = 0
+        self.misses = 0
+        self.high_water = 0
+
+    def __len__(self):
+        """Return the number of live entities"""
+        return self.count
+
+    def __contains__(self, handle):
+        """Check whether a handle still refers to a live entity"""
+        row = handle & INDEX_MASK
+        return row < self.end and self.alive[row] and self.generation[row] == handle >> INDEX_BITS
+
+    def reserve(self, capacity):
+        """Grow the columns so they can hold at least capacity entities"""
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2)
+        if capacity > INDEX_MASK + 1:
+            raise OverflowError("entity store is full")
+        for name, _, *_ in self.components:
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:self.end] = column[:self.end]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def create(self, **values):
+        """
+        Add an entity with the given component values and return its
+        handle. Components not given are zero; prev_x and prev_y default
+        to x and y.
+        """
+        if self.free:
+            row = self.free.pop()
+            self.hits += 1
+        else:
+            self.reserve(self.end + 1)
+            row = self.end
+            self.end += 1
+            self.misses += 1
+        for name in self.names:
+            value = values.get(name)
+            if value is None:
+                if name == 'prev_x' or name == 'prev_y':
+                    value = values.get(name[5:], 0)
+                else:
+                    value = 0
+            getattr(self, name)[row] = value
+        self.alive[row] = True
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        return self.handle(row)
+
+    def describe(self):
+        """Return the counters as a short line for overlays"""
+        return f"{self.count} live, {self.high_water} peak, {self.hits} hits, {self.misses} misses"
+
+    def handle(self, row):
+        """Return the handle of the entity in a row"""
+        return int(self.generation[row]) << INDEX_BITS | row
+
+    def row(self, handle):
+        """Return the row of a live entity, raising KeyError for a stale handle"""
+        if handle not in self:
+            raise KeyError(handle)
+        return handle & INDEX_MASK
+
+    def destroy(self, handle):
+        """Remove an entity, raising KeyError for a stale handle"""
+        self.release(self.row(handle))
+
+    def release(self, row):
+        """Remove the entity in a live row"""
+        self.alive[row] = False
+        self.generation[row] += 1
+        if 'vx' in self.names:
+            self.vx[row] = self.vy[row] = 0
+        self.free.append(row)
+        self.count -= 1
+
+    def destroy_where(self, mask):
+        """
+        Remove the live entities whose rows are set in mask, a boolean
+        array over [0, end). Return the removed rows.
+        """
+        rows = np.flatnonzero(mask & self.alive[:self.end])
+        if len(rows):
+            self.alive[rows] = False
+            self.generation[rows] += 1
+            if 'vx' in self.names:
+                self.vx[rows] = 0
+                self.vy[rows] = 0
+            self.free.extend(rows.tolist())
+            self.count -= len(rows)
+        return rows
+
+    def live(self):
+        """Return the rows of every live entity, in row order"""
+        return np.flatnonzero(self.alive[:self.end])
+
+    def move(self):
+        """Move every entity by its velocity, remembering where it was"""
+        n = self.end
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+
+    def overlapping(self, left, top, right, bottom):
+        """
+        Return a boolean array over [0, end) marking the live entities
+        whose bounds overlap the given area, as pygame.Rect.colliderect
+        would for positive sizes
+        """
+        n = self.end
+        x = self.x[:n]
+        y = self.y[:n]
+        return (self.alive[:n] & (x < right) & (x + self.width[:n] > left)
+                & (y < bottom) & (y + self.height[:n] > top))
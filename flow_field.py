@@ -0,0 +1,123 @@
+import heapq
+import math
+
+import numpy as np
+
+# Neighbour offsets with their step costs
+NEIGHBOURS = [(dx, dy, math.hypot(dx, dy)) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+def dijkstra(cols, rows, blocked, goal):
+    """Return the distance list of Dijkstra outward from goal over 8-connected open cells"""
+    distance = [math.inf] * (cols * rows)
+    distance[goal] = 0.0
+    queue = [(0.0, goal)]
+    while queue:
+        d, cell = heapq.heappop(queue)
+        if d > distance[cell]:
+            continue
+        row, col = divmod(cell, cols)
+        for dx, dy, cost in NEIGHBOURS:
+            c, r = col + dx, row + dy
+            if not (0 <= c < cols and 0 <= r < rows):
+                continue
+            neighbour = r * cols + c
+            # No corner cutting between two blocked cells
+            if blocked[neighbour] or (dx and dy and (blocked[row * cols + c] or blocked[r * cols + col])):
+                continue
+            nd = d + cost
+            if nd < distance[neighbour]:
+                distance[neighbour] = nd
+                heapq.heappush(queue, (nd, neighbour))
+    return distance
+
+
+class FlowField:
+    """
+    Grid of steering directions leading every cell towards a goal.
+    Distances to the goal are computed with Dijkstra over the grid, so
+    agents only look up the direction for their cell. Cells can be
+    marked blocked and paths will route around them. While no cell is
+    blocked the distances only depend on the offset from the goal, so
+    one Dijkstra from the centre of a grid twice the size is sliced for
+    every goal instead of searching again each time the goal moves.
+    """
+    def __init__(self, width, height, cell_size=40):
+        """Create a field covering width x height pixels"""
+        self.cell_size = cell_size
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+        self.blocked = [False] * (self.cols * self.rows)
+        self.blocked_count = 0
+        self.open_distance = None  # (2 * rows - 1, 2 * cols - 1) distances from the centre cell
+        self.distance = np.full((self.rows, self.cols), math.inf)
+        self.directions = [(0.0, 0.0)] * (self.cols * self.rows)
+        self.goal = None
+
+    def cell_of(self, x, y):
+        """Return the index of the cell containing a point, clamped to the grid"""
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return row * self.cols + col
+
+    def set_blocked(self, x, y, blocked=True):
+        """Mark the cell containing a point as an obstacle and force a rebuild"""
+        cell = self.cell_of(x, y)
+        self.blocked_count += blocked - self.blocked[cell]
+        self.blocked[cell] = blocked
+        self.goal = None
+
+    def update(self, x, y):
+        """Rebuild the field if the goal point moved to another cell; return True if rebuilt"""
+        goal = self.cell_of(x, y)
+        if goal == self.goal:
+            return False
+        self.goal = goal
+        self.build_distances(goal)
+        self.build_directions()
+        return True
+
+    def build_distances(self, goal):
+        """Fill distance with the cost of the cheapest path from every cell to the goal"""
+        cols, rows = self.cols, self.rows
+        if self.blocked_count:
+            self.distance = np.array(dijkstra(cols, rows, self.blocked, goal)).reshape(rows, cols)
+            return
+        if self.open_distance is None:
+            width, height = 2 * cols - 1, 2 * rows - 1
+            centre = (rows - 1) * width + cols - 1
+            self.open_distance = np.array(dijkstra(width, height, [False] * (width * height), centre))
+            self.open_distance = self.open_distance.reshape(height, width)
+        row, col = divmod(goal, cols)
+        self.distance = self.open_distance[rows - 1 - row:2 * rows - 1 - row, cols - 1 - col:2 * cols - 1 - col]
+
+    def build_directions(self):
+        """
+        Turn distances into unit steering vectors: the sum of the
+        directions to each neighbour, weighted by how much closer it is.
+        """
+        distance = self.distance
+        rows, cols = distance.shape
+        # Pad with unreachable cells so every neighbour is a shifted view
+        padded = np.full((rows + 2, cols + 2), math.inf)
+        padded[1:-1, 1:-1] = distance
+        sx = np.zeros((rows, cols))
+        sy = np.zeros((rows, cols))
+        with np.errstate(invalid='ignore'):
+            for dx, dy, cost in NEIGHBOURS:
+                gain = distance - padded[1 + dy:rows + 1 + dy, 1 + dx:cols + 1 + dx]
+                closer = gain > 0
+                sx += np.where(closer, dx / cost * gain, 0.0)
+                sy += np.where(closer, dy / cost * gain, 0.0)
+        still = (distance == 0.0) | (distance == math.inf)
+        sx[still] = 0.0
+        sy[still] = 0.0
+        # Normalise with math.hypot, which rounds differently from np.hypot
+        directions = self.directions
+        for cell, (x, y) in enumerate(zip(sx.ravel().tolist(), sy.ravel().tolist())):
+            length = math.hypot(x, y)
+            directions[cell] = (x / length, y / length) if length else (0.0, 0.0)
+
+    def direction(self, x, y):
+        """Return the unit steering vector for a point; (0, 0) in the goal cell"""
+        return self.directions[self.cell_of(x, y)]
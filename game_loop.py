@@ -0,0 +1,304 @@
+import threading
+import time
+from collections import deque
+
+import pygame
+
+from gc_policy import GCPolicy
+
+
+def lerp(previous, current, alpha):
+    """Interpolate between the previous and current simulated value"""
+    return previous + (current - previous) * alpha
+
+
+def step_scale(step_rate, tuned_rate):
+    """
+    Return the factor turning a per-step amount tuned for tuned_rate
+    steps a second into one that covers the same ground a second at
+    step_rate; exactly 1 at the tuned rate, so integer motion stays integer
+    """
+    return 1 if step_rate == tuned_rate else tuned_rate / step_rate
+
+
+def scale_steps(steps, scale):
+    """Return how many steps at a step_scale() of scale last as long as steps tuned steps"""
+    return steps if scale == 1 else max(1, round(steps / scale))
+
+
+class SnapshotBuffer:
+    """
+    Two preallocated render snapshots handed from a simulation thread to
+    the render thread. The writer fills whichever snapshot the reader is
+    not holding and publishes it; the reader takes the latest published
+    one. The lock only guards those index swaps, never a copy or a draw,
+    and a writer that finds the reader still holding the other snapshot
+    skips that capture instead of waiting.
+    """
+    def __init__(self, make_snapshot):
+        """Create both snapshots with make_snapshot()"""
+        self.snapshots = (make_snapshot(), make_snapshot())
+        self.lock = threading.Lock()
+        self.published = None  # Index of the latest complete snapshot
+        self.reading = None  # Index of the snapshot the reader holds
+        self.writing = None
+        self.skipped = 0  # Captures skipped because the reader was behind
+
+    def begin_write(self):
+        """Return the snapshot to fill next, or None if the reader holds it"""
+        with self.lock:
+            target = 0 if self.published is None else 1 - self.published
+            if target == self.reading:
+                self.skipped += 1
+                return None
+            self.writing = target
+        return self.snapshots[target]
+
+    def publish(self):
+        """Make the snapshot from begin_write() the latest one"""
+        with self.lock:
+            self.published = self.writing
+
+    def acquire(self):
+        """Hold the latest published snapshot for reading; None before the first"""
+        with self.lock:
+            self.reading = self.published
+        return None if self.reading is None else self.snapshots[self.reading]
+
+    def release(self):
+        """Let the writer reuse the snapshot held since acquire()"""
+        with self.lock:
+            self.reading = None
+
+
+class FixedStepLoop:
+    """
+    Game loop driver with a fixed simulation step.
+    Real time is collected in an accumulator and spent in whole steps of
+    1/step_rate seconds, so the simulation runs at the same speed however
+    long a frame takes to render. Frames are drawn at up to render_rate
+    with the fraction of a step left over (alpha) for interpolation.
+    After max_catch_up steps in one frame the remaining backlog is
+    dropped, so a slow machine slows the game down instead of falling
+    further and further behind.
+    With a profiler every step and draw is recorded as a section.
+    busy holds the seconds the last frame spent stepping and drawing,
+    without the wait for the frame cap.
+    run_threaded() moves the simulation to a worker thread that hands
+    render snapshots to this one; games fetch events through events()
+    and run display work from a step through on_main_thread(), so pygame
+    is only ever called from the main thread.
+    With manage_gc, live runs put garbage collection under a GCPolicy:
+    collections run in the slack left at the end of a frame, and games
+    call collect_garbage() when the player is not watching the frame rate.
+    """
+    def __init__(self, step_rate=60, render_rate=60, max_catch_up=5, clock=time.perf_counter, profiler=None,
+                 manage_gc=True):
+        """Create a loop stepping step_rate times and drawing render_rate times a second"""
+        self.step_rate = step_rate
+        self.render_rate = render_rate
+        self.max_catch_up = max_catch_up
+        self.step_time = 1 / step_rate
+        self.clock = clock
+        self.frame_clock = pygame.time.Clock()
+        self.steps = 0
+        self.frames = 0
+        self.dropped = 0.0  # Seconds of simulation skipped by the catch-up cap
+        self.busy = 0.0
+        self.profiler = profiler
+        self.threaded = False
+        self.pending_events = deque()  # Events fetched by the render thread for the next step
+        self.main_calls = deque()  # (function, args, done) queued by the simulation thread
+        self.gc_policy = GCPolicy(profiler) if manage_gc else None
+        self.resync()
+
+    def resync(self):
+        """Forget time spent outside the loop, e.g. while a menu was blocking"""
+        self.previous = self.clock()
+        self.accumulator = 0.0
+
+    def run(self, step, draw, running, max_steps=None, headless=False):
+        """
+        Run until running() is false or max_steps steps were simulated.
+        step() advances the simulation by one fixed step and draw(alpha)
+        renders. Headless runs just step as fast as possible.
+        Return the number of steps simulated.
+        """
+        if self.profiler is not None:
+            step = self.timed(step, 'step')
+            draw = self.timed(draw, 'draw')
+
+        if headless:
+            while running() and self.steps != max_steps:
+                step()
+                self.steps += 1
+            return self.steps
+
+        if self.gc_policy is not None:
+            self.gc_policy.start()
+        self.resync()
+        try:
+            self.run_frames(step, draw, running, max_steps)
+        finally:
+            if self.gc_policy is not None:
+                self.gc_policy.stop()
+        return self.steps
+
+    def run_frames(self, step, draw, running, max_steps):
+        """The body of run() for live runs"""
+        while running() and self.steps != max_steps:
+            now = self.clock()
+            self.accumulator += now - self.previous
+            self.previous = now
+
+            catch_up = 0
+            while self.accumulator >= self.step_time and running() and self.steps != max_steps:
+                step()
+                self.steps += 1
+                self.accumulator -= self.step_time
+                catch_up += 1
+                if catch_up == self.max_catch_up:
+                    # Spiral of death guard: keep at most one step of backlog
+                    if self.accumulator > self.step_time:
+                        self.dropped += self.accumulator - self.step_time
+                        self.accumulator = self.step_time
+                    break
+
+            if not running():
+                break
+            draw(min(self.accumulator / self.step_time, 1.0))
+            self.busy = self.clock() - now
+            self.frames += 1
+            self.end_frame()
+
+    def end_frame(self):
+        """Spend the frame's slack on garbage collection, then wait for the frame cap"""
+        if self.gc_policy is not None:
+            self.gc_policy.idle((1 / self.render_rate if self.render_rate else 0) - self.busy)
+            self.gc_policy.end_frame()
+        self.frame_clock.tick(self.render_rate)
+
+    def collect_garbage(self):
+        """Do a full garbage collection now, while nothing time-critical is on screen"""
+        if self.gc_policy is not None:
+            self.gc_policy.collect()
+
+    def run_threaded(self, step, capture, draw, running, make_snapshot, max_steps=None):
+        """
+        Run with the simulation on a worker thread until running() is
+        false or max_steps steps were simulated. After every step,
+        capture(snapshot) copies the render state into a free one of two
+        snapshots made by make_snapshot(). This thread owns the events and
+        the display and calls draw(alpha, snapshot) with the latest
+        complete snapshot, alpha being the time since its step.
+        An exception raised on the worker ends the run and is raised
+        again here once the worker has stopped.
+        Return the number of steps simulated.
+        """
+        if self.profiler is not None:
+            step = self.timed(step, 'step')
+            capture = self.timed(capture, 'capture')
+            draw = self.timed(draw, 'draw')
+        buffer = SnapshotBuffer(make_snapshot)
+        stopped = threading.Event()
+        failure = []  # Exception that ended the worker, if any
+
+        def simulate():
+            try:
+                run_steps()
+            except BaseException as error:
+                failure.append(error)
+
+        def run_steps():
+            self.resync()
+            while running() and self.steps != max_steps and not stopped.is_set():
+                now = self.clock()
+                self.accumulator += now - self.previous
+                self.previous = now
+                if self.accumulator < self.step_time:
+                    time.sleep(self.step_time - self.accumulator)
+                    continue
+
+                step()
+                self.steps += 1
+                self.accumulator -= self.step_time
+                backlog = self.max_catch_up * self.step_time
+                if self.accumulator > backlog:
+                    self.dropped += self.accumulator - backlog
+                    self.accumulator = backlog
+
+                snapshot = buffer.begin_write()
+                if snapshot is not None:
+                    capture(snapshot)
+                    snapshot.time = self.clock()
+                    buffer.publish()
+
+        self.threaded = True
+        if self.gc_policy is not None:
+            self.gc_policy.start()
+        worker = threading.Thread(target=simulate, name="simulation", daemon=True)
+        worker.start()
+        try:
+            while worker.is_alive():
+                started = self.clock()
+                self.pending_events.extend(pygame.event.get())
+                while self.main_calls:
+                    function, args, done = self.main_calls.popleft()
+                    try:
+                        function(*args)
+                    finally:
+                        done.set()
+
+                snapshot = buffer.acquire()
+                if snapshot is not None:
+                    draw(min((self.clock() - snapshot.time) / self.step_time, 1.0), snapshot)
+                    self.frames += 1
+                buffer.release()
+                self.busy = self.clock() - started
+                self.end_frame()
+        finally:
+            # Stop the worker even if drawing failed, releasing any call it waits on
+            stopped.set()
+            while self.main_calls:
+                self.main_calls.popleft()[2].set()
+            worker.join()
+            self.threaded = False
+            if self.gc_policy is not None:
+                self.gc_policy.stop()
+        if failure:
+            raise failure[0]
+        return self.steps
+
+    def events(self):
+        """
+        Return the pygame events for a step: fetched directly, or handed
+        over by the render thread while running threaded
+        """
+        if not self.threaded:
+            return pygame.event.get()
+        events = []
+        while self.pending_events:
+            events.append(self.pending_events.popleft())
+        return events
+
+    def on_main_thread(self, function, *args):
+        """
+        Call function(*args) on the main thread, which owns the display.
+        From the simulation thread this waits until the render thread has
+        run it between two frames; otherwise it is a plain call.
+        """
+        if not self.threaded or threading.current_thread() is threading.main_thread():
+            function(*args)
+            return
+        done = threading.Event()
+        self.main_calls.append((function, args, done))
+        done.wait()
+
+    def timed(self, function, name):
+        """Wrap a loop callback so every call is recorded as a profiler section"""
+        section = self.profiler.section(name)
+
+        def timed_function(*args):
+            with section:
+                function(*args)
+        return timed_function
@@ -0,0 +1,113 @@
+import gc
+import time
+
+FORCE_FACTOR = 10  # Multiple of a generation's threshold at which it stops waiting for idle time
+DEFAULT_COST = 0.0005  # Assumed seconds per collection of a generation not yet timed
+SECTION_NAMES = ('gc gen 0', 'gc gen 1', 'gc gen 2')  # Profiler sections of each generation's collections
+
+
+class GCPolicy:
+    """
+    Loop-level control of Python's cyclic garbage collector.
+    start() runs a full collection, freezes everything alive (the
+    game's long-lived state) out of future collections and turns
+    automatic collection off. From then on the loop calls idle(slack)
+    with the time left over in each frame, and a generation is only
+    collected when the collector's own thresholds say it is due and its
+    last collection fit in the slack; an older generation that does not
+    fit waits while younger ones keep being collected. If idle time
+    never comes, a generation is collected anyway once it reaches
+    FORCE_FACTOR times its threshold, so memory cannot grow without bound.
+    Blocking screens call collect() to do a full collection while the
+    player is not watching the frame rate.
+    Every collection, wherever it comes from, is timed through
+    gc.callbacks: it is recorded as a 'gc gen N' profiler section (so it
+    shows up in traces inside the step or draw it interrupted) and its
+    pause is added to the current frame's total.
+    """
+    def __init__(self, profiler=None):
+        """Create a policy, recording collections into profiler if given"""
+        self.profiler = profiler
+        self.section = None  # Profiler section of the collection in progress
+        self.cost = [DEFAULT_COST] * 3  # Seconds the last collection of each generation took
+        self.collections = [0] * 3
+        self.started = 0
+        self.frame_pause = 0  # Nanoseconds of collection in the current frame
+        self.last_pause = 0  # Nanoseconds of collection in the last finished frame
+        self.worst_pause = 0  # Most nanoseconds of collection in any one frame
+        self.active = False
+        self.was_enabled = True
+
+    def start(self):
+        """Collect, freeze the survivors and take over from automatic collection"""
+        if self.active:
+            return
+        self.active = True
+        self.was_enabled = gc.isenabled()
+        gc.callbacks.append(self.on_collection)
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        self.frame_pause = 0  # The startup collection belongs to no frame
+
+    def stop(self):
+        """Hand collection back to the interpreter, unfreezing what start() froze"""
+        if not self.active:
+            return
+        self.active = False
+        gc.callbacks.remove(self.on_collection)
+        gc.unfreeze()
+        if self.was_enabled:
+            gc.enable()
+
+    def idle(self, slack):
+        """Spend up to slack seconds of spare frame time on the oldest due collection that fits"""
+        if not self.active:
+            return
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+        for generation in (2, 1, 0):
+            threshold = thresholds[generation]
+            if not threshold or counts[generation] < threshold:
+                continue
+            if self.cost[generation] <= slack or counts[generation] >= threshold * FORCE_FACTOR:
+                gc.collect(generation)
+                return
+
+    def collect(self):
+        """Do a full collection now, e.g. while a menu or game over screen is up"""
+        if self.active:
+            gc.collect()
+
+    def end_frame(self):
+        """Close the current frame's pause total; return it in nanoseconds"""
+        pause = self.frame_pause
+        self.frame_pause = 0
+        self.last_pause = pause
+        if pause > self.worst_pause:
+            self.worst_pause = pause
+        if pause and self.profiler is not None:
+            self.profiler.note('gc', self.describe())
+        return pause
+
+    def on_collection(self, phase, info):
+        """gc.callbacks hook: time every collection"""
+        generation = info['generation']
+        if phase == 'start':
+            self.started = time.perf_counter_ns()
+            if self.profiler is not None:
+                self.section = self.profiler.section(SECTION_NAMES[generation])
+                self.section.__enter__()
+            return
+        if self.section is not None:
+            self.section.__exit__(None, None, None)
+            self.section = None
+        pause = time.perf_counter_ns() - self.started
+        self.cost[generation] = pause / 1e9
+        self.collections[generation] += 1
+        self.frame_pause += pause
+
+    def describe(self):
+        """Return the pause statistics as a short line for overlays"""
+        runs = '/'.join(str(count) for count in self.collections)
+        return f"last {self.last_pause / 1e6:.2f} ms, worst {self.worst_pause / 1e6:.2f} ms, runs {runs}"
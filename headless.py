@@ -0,0 +1,125 @@
+import os
+from collections import namedtuple
+
+import pygame
+
+# One frame of input: keys held down, keys pressed this frame (in order)
+# and the mouse position
+InputFrame = namedtuple('InputFrame', ['held', 'downs', 'mouse'])
+IDLE_FRAME = InputFrame(frozenset(), (), (0, 0))
+
+
+def use_dummy_drivers():
+    """Make SDL open windowless video and silent audio; call before pygame.init()"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def idle_script(frame):
+    """Script that never touches the controls"""
+    return IDLE_FRAME
+
+
+class KeyState:
+    """
+    Stand-in for pygame.key.get_pressed().
+    Indexed by pygame key constants, backed by a set of held keys.
+    """
+    def __init__(self, held):
+        """Wrap a collection of held key constants"""
+        self.held = held
+
+    def __getitem__(self, key):
+        """Return True if the key is held"""
+        return key in self.held
+
+
+class LiveInput:
+    """
+    Input source reading the real keyboard and mouse. Time is simulated,
+    one frame per advance() as in ScriptedInput, so timers run at the
+    simulation's speed however long frames take to render.
+    """
+    def __init__(self, fps=60):
+        """Start with no keys pressed this frame"""
+        self.fps = fps
+        self.frame = 0
+        self.key_downs = ()
+
+    def advance(self, events):
+        """Start a new frame from the pygame events fetched for it"""
+        self.frame += 1
+        self.key_downs = tuple(event.key for event in events if event.type == pygame.KEYDOWN)
+
+    @property
+    def finished(self):
+        """Live input never runs out"""
+        return False
+
+    @property
+    def endless(self):
+        """Live input has no end of its own"""
+        return True
+
+    def get_pressed(self):
+        """Return the held-key state"""
+        return pygame.key.get_pressed()
+
+    def get_mouse_pos(self):
+        """Return the mouse position"""
+        return pygame.mouse.get_pos()
+
+    def get_ticks(self):
+        """Return simulated milliseconds, one frame at a time"""
+        return self.frame * 1000 // self.fps
+
+
+class ScriptedInput:
+    """
+    Input source replaying scripted frames instead of the real devices.
+    The script is either a sequence of InputFrame or a callable taking the
+    frame number and returning one. Time advances by exactly one frame per
+    advance() so runs do not depend on wall-clock speed.
+    """
+    def __init__(self, script=idle_script, fps=60):
+        """Prepare to play the script from frame 0"""
+        self.script = script
+        self.fps = fps
+        self.frame = 0
+        self.current = IDLE_FRAME
+        self.key_downs = ()
+        self.keys = KeyState(self.current.held)
+
+    @property
+    def finished(self):
+        """True once a sequence script has been played to the end"""
+        return not callable(self.script) and self.frame >= len(self.script)
+
+    @property
+    def endless(self):
+        """True for a callable script, which never finishes"""
+        return callable(self.script)
+
+    def advance(self, events):
+        """Move to the next scripted frame; real events are ignored"""
+        if callable(self.script):
+            self.current = self.script(self.frame)
+        elif self.frame < len(self.script):
+            self.current = self.script[self.frame]
+        else:
+            self.current = IDLE_FRAME
+        self.frame += 1
+        self.key_downs = tuple(self.current.downs)
+        self.keys = KeyState(self.current.held)
+
+    def get_pressed(self):
+        """Return the held-key state of the current frame"""
+        return self.keys
+
+    def get_mouse_pos(self):
+        """Return the mouse position of the current frame"""
+        return self.current.mouse
+
+    def get_ticks(self):
+        """Return simulated milliseconds, one frame at a time"""
+        return self.frame * 1000 // self.fps
@@ -0,0 +1,164 @@
+import random
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+
+class ParticleSystem:
+    """
+    Array-backed particle system.
+    Particles live in packed NumPy columns (position, velocity, size and
+    remaining life), are updated with whole-column operations and drawn
+    as pre-rendered sprites with one Surface.blits call per sprite size.
+    Size 1 particles are written straight into the pixel array, which is
+    what makes very dense fields (100k and up) affordable.
+    Particles with negative life never expire; when they float off the
+    top of the area they respawn along the bottom edge at a random x.
+    """
+    def __init__(self, width, height, capacity=256, color=(255, 255, 255), seed=None, step_scale=1):
+        """
+        Create an empty system for an area of the given size. Its NumPy
+        generator is seeded with seed, or from the random module if None.
+        Velocities and lifetimes passed to emit() are per step at the
+        tuned rate and are converted by step_scale (see game_loop.step_scale).
+        """
+        self.width = width
+        self.height = height
+        self.color = color
+        self.step_scale = step_scale
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.sprites = {}
+
+        # Seed NumPy from the random module so seeding random reproduces a run
+        self.rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+
+    def __len__(self):
+        """Return the number of live particles"""
+        return self.count
+
+    def reserve(self, capacity):
+        """Grow the columns so they can hold at least capacity particles"""
+        if capacity <= len(self.x):
+            return
+        capacity = max(capacity, len(self.x) * 2)
+        for name in ('x', 'y', 'vx', 'vy', 'size', 'life'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+
+    def copy_from(self, other):
+        """Make this system a copy of another one's particles, reusing the columns"""
+        count = other.count
+        self.reserve(count)
+        for name in ('x', 'y', 'vx', 'vy', 'size', 'life'):
+            getattr(self, name)[:count] = getattr(other, name)[:count]
+        self.count = count
+
+    def emit(self, count, x, y, vx, vy, size, life=-1):
+        """
+        Add count particles. Each attribute may be a scalar or an array
+        of length count.
+        """
+        scale = self.step_scale
+        if scale != 1:
+            vx = np.multiply(vx, scale)
+            vy = np.multiply(vy, scale)
+            life = np.where(np.greater(life, 0), np.maximum(np.rint(np.divide(life, scale)), 1), life)
+        self.reserve(self.count + count)
+        new = slice(self.count, self.count + count)
+        self.x[new] = x
+        self.y[new] = y
+        self.vx[new] = vx
+        self.vy[new] = vy
+        self.size[new] = size
+        self.life[new] = life
+        self.count += count
+
+    def update(self):
+        """Move every particle, respawn endless ones and drop expired ones"""
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        life = self.life[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+        life[life > 0] -= 1
+
+        # Endless particles that left the top come back along the bottom
+        respawn = (life < 0) & (y < 0)
+        respawned = int(np.count_nonzero(respawn))
+        if respawned:
+            y[respawn] = self.height
+            x[respawn] = self.rng.integers(0, self.width, respawned, endpoint=True)
+
+        # Expired particles and short-lived ones that left the area are removed
+        dead = (life == 0) | ((life > 0) & ((y < 0) | (y > self.height)))
+        if dead.any():
+            alive = ~dead
+            kept = int(np.count_nonzero(alive))
+            for column in (self.x, self.y, self.vx, self.vy, self.size, self.life):
+                column[:kept] = column[:n][alive]
+            self.count = kept
+
+    def sprite(self, size):
+        """Return the pre-rendered circle sprite for a particle size"""
+        sprite = self.sprites.get(size)
+        if sprite is None:
+            sprite = pygame.Surface((size * 2 + 1, size * 2 + 1))
+            sprite.set_colorkey((0, 0, 0))
+            pygame.draw.circle(sprite, self.color, (size, size), size)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self.sprites[size] = sprite
+        return sprite
+
+    def draw(self, screen, alpha=1.0, offset_y=0, stride=1, scale=1):
+        """
+        Draw all on-screen particles: points in one array write, sprites
+        batched per size. Particles move in straight lines, so alpha < 1
+        draws them that fraction of the way through the last update.
+        offset_y shifts them all down, e.g. for a camera between updates,
+        stride > 1 thins the field by drawing only every stride-th one,
+        and scale < 1 draws onto a reduced-resolution screen. Particles
+        outside the screen's clip area are skipped.
+        """
+        live = slice(0, self.count, stride)
+        clip = screen.get_clip()
+        size = self.size[live]
+        if alpha < 1.0:
+            back = 1.0 - alpha
+            x = self.x[live] - self.vx[live] * back
+            y = self.y[live] + (offset_y - self.vy[live] * back)
+        else:
+            x = self.x[live]
+            y = self.y[live] + offset_y
+        if scale != 1:
+            x = x * scale
+            y = y * scale
+            size = np.maximum(np.rint(size * scale), 1).astype(np.int32)
+        x = x.astype(np.int32)
+        y = y.astype(np.int32)
+
+        points = (size <= 1) & (x >= clip.left) & (x < clip.right) & (y >= clip.top) & (y < clip.bottom)
+        if points.any():
+            pixels = pygame.surfarray.pixels2d(screen)
+            pixels[x[points], y[points]] = screen.map_rgb(self.color)
+            del pixels  # Unlock the surface before blitting
+
+        left = x - size
+        top = y - size
+        side = 2 * size + 1  # Sprite width and height
+        visible = ((size > 1) & (left < clip.right) & (top < clip.bottom)
+                   & (left + side > clip.left) & (top + side > clip.top))
+        for particle_size in np.unique(size[visible]).tolist():
+            batch = visible & (size == particle_size)
+            positions = np.column_stack((left[batch], top[batch])).tolist()
+            screen.blits(zip(repeat(self.sprite(particle_size)), positions), doreturn=False)
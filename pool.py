@@ -0,0 +1,42 @@
+class ObjectPool:
+    """
+    Free list of reusable objects of one class.
+    acquire(*args) hands out a released object re-initialised with its
+    reset(*args) method, or a new cls(*args) when none is free, and
+    release(obj) takes one back. Objects are expected to do all their
+    setup in reset, so a reused object is indistinguishable from a new
+    one. The counters show how well the pool covers the churn: hits and
+    misses are acquires served from the free list and by construction,
+    high_water is the most objects ever out at once.
+    """
+    def __init__(self, cls):
+        """Create an empty pool of cls objects"""
+        self.cls = cls
+        self.free = []
+        self.live = 0
+        self.hits = 0
+        self.misses = 0
+        self.high_water = 0
+
+    def acquire(self, *args):
+        """Return a reset free object, or a new one if none is free"""
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.hits += 1
+        else:
+            obj = self.cls(*args)
+            self.misses += 1
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return obj
+
+    def release(self, obj):
+        """Take back an object that is no longer used"""
+        self.free.append(obj)
+        self.live = max(self.live - 1, 0)
+
+    def describe(self):
+        """Return the counters as a short line for overlays"""
+        return f"{self.live} live, {self.high_water} peak, {self.hits} hits, {self.misses} misses"
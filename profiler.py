@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+from array import array
+
+import pygame
+
+OVERLAY_KEY = pygame.K_F3
+DUMP_KEY = pygame.K_F4
+OVERLAY_REFRESH = 15  # Frames between overlay text refreshes
+SMOOTHING = 0.05  # Weight of the newest sample in the running averages
+TRACE_BATCH = 64  # Events formatted between pauses when dumping a trace
+TRACE_PAUSE = 0.001  # Seconds the trace writer sleeps between batches
+TRACE_EVENT = '{"name": %s, "ph": "X", "ts": %.3f, "dur": %.3f, "pid": 1, "tid": %d}'
+
+
+class Section:
+    """
+    One named, timed phase of the frame. Used as a context manager;
+    sections are created once per name and reused every frame.
+    """
+    def __init__(self, profiler, index, name):
+        """Create the section for a name"""
+        self.profiler = profiler
+        self.index = index
+        self.name = name
+        self.started = 0
+        self.last = 0  # Nanoseconds taken by the latest run
+        self.average = 0.0  # Running average in nanoseconds
+
+    def __enter__(self):
+        """Start timing"""
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop timing and append the sample to the ring buffer"""
+        ended = time.perf_counter_ns()
+        profiler = self.profiler
+        if not profiler.enabled:
+            return False
+        slot = profiler.head
+        profiler.starts[slot] = self.started
+        profiler.ends[slot] = ended
+        profiler.sections[slot] = self.index
+        profiler.threads[slot] = threading.current_thread() is not profiler.main_thread
+        slot += 1
+        profiler.head = 0 if slot == profiler.capacity else slot
+        profiler.recorded += 1
+
+        self.last = ended - self.started
+        self.average += (self.last - self.average) * SMOOTHING
+        return False
+
+
+class FrameProfiler:
+    """
+    Lightweight per-phase frame profiler.
+    Samples (section, thread, start, end) go into preallocated ring
+    buffers, so recording allocates nothing and the last capacity samples
+    are kept.
+    The buffer can be shown as an on-screen overlay of running averages
+    or written out as Chrome trace JSON (chrome://tracing, Perfetto) on a
+    background thread. The overlay also lists any notes set by the game,
+    such as its current quality level.
+    """
+    def __init__(self, capacity=65536, enabled=True):
+        """Create a profiler keeping the latest capacity samples"""
+        self.capacity = capacity
+        self.enabled = enabled
+        self.starts = array('q', bytes(8 * capacity))
+        self.ends = array('q', bytes(8 * capacity))
+        self.sections = array('H', bytes(2 * capacity))
+        self.threads = array('B', bytes(capacity))  # 0 on the main thread, 1 on any other
+        self.main_thread = threading.main_thread()
+        self.head = 0
+        self.recorded = 0
+        self.names = {}
+        self.order = []
+        self.origin = time.perf_counter_ns()
+        self.notes = {}  # Name -> text shown under the sections in the overlay
+
+        self.show_overlay = False
+        self.overlay = None
+        self.overlay_age = 0
+
+    def section(self, name):
+        """Return the reusable timing section for a phase name"""
+        section = self.names.get(name)
+        if section is None:
+            section = Section(self, len(self.order), name)
+            self.names[name] = section
+            self.order.append(section)
+        return section
+
+    def note(self, name, text):
+        """Show a line of game state in the overlay, replacing any earlier note of that name"""
+        if self.notes.get(name) == text:
+            return
+        self.notes[name] = text
+        self.overlay = None
+
+    def handle_event(self, event):
+        """React to the profiler hotkeys: overlay toggle and trace dump"""
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == OVERLAY_KEY:
+            self.show_overlay = not self.show_overlay
+            self.overlay = None
+        elif event.key == DUMP_KEY:
+            self.dump(time.strftime("profile-%Y%m%d-%H%M%S.json"))
+
+    def draw_overlay(self, screen, text, font):
+        """Draw the running average of every section in the top right corner, if shown"""
+        if not self.show_overlay:
+            return None
+        self.overlay_age += 1
+        if self.overlay is None or self.overlay_age >= OVERLAY_REFRESH:
+            self.overlay = self.render_overlay(text, font)
+            self.overlay_age = 0
+        return screen.blit(self.overlay, (screen.get_width() - self.overlay.get_width() - 10, 10))
+
+    def render_overlay(self, text, font):
+        """Render the overlay panel"""
+        lines = [text.render(font, f"{section.name:<24} {section.average / 1e6:6.2f} ms", (255, 255, 0))
+                 for section in self.order]
+        lines += [text.render(font, f"{name:<24} {note}", (0, 255, 255))
+                  for name, note in self.notes.items()]
+        width = max((line.get_width() for line in lines), default=0)
+        height = sum(line.get_height() for line in lines)
+        panel = pygame.Surface((width + 8, height + 8))
+        panel.set_alpha(200)
+        y = 4
+        for line in lines:
+            panel.blit(line, (4, y))
+            y += line.get_height()
+        return panel
+
+    def snapshot(self):
+        """Return copies of the buffered samples, oldest first"""
+        count = min(self.recorded, self.capacity)
+        first = (self.head - count) % self.capacity
+        if first + count <= self.capacity:
+            window = slice(first, first + count)
+            return self.sections[window], self.threads[window], self.starts[window], self.ends[window]
+        return (self.sections[first:] + self.sections[:self.head],
+                self.threads[first:] + self.threads[:self.head],
+                self.starts[first:] + self.starts[:self.head],
+                self.ends[first:] + self.ends[:self.head])
+
+    def dump(self, path):
+        """
+        Write the buffer to path as Chrome trace JSON. Only the copy of the
+        buffers happens on the calling thread; return the writer thread.
+        """
+        sections, threads, starts, ends = self.snapshot()
+        names = [section.name for section in self.order]
+        writer = threading.Thread(
+            target=write_trace,
+            args=(path, names, sections, threads, starts, ends, self.origin),
+            daemon=True
+        )
+        writer.start()
+        return writer
+
+
+def write_trace(path, names, sections, threads, starts, ends, origin):
+    """
+    Write samples as Chrome trace complete events, in microseconds, with
+    main-thread samples on track 1 and the others on track 2.
+    Events are formatted in small batches with a sleep in between, so
+    the writer thread keeps handing the GIL back to the game loop.
+    """
+    quoted = [json.dumps(name) for name in names]
+    with open(path, 'w') as f:
+        f.write('{"displayTimeUnit": "ms", "traceEvents": [')
+        separator = ''
+        for first in range(0, len(sections), TRACE_BATCH):
+            time.sleep(TRACE_PAUSE)
+            last = first + TRACE_BATCH
+            batch = zip(sections[first:last], threads[first:last], starts[first:last], ends[first:last])
+            f.write(separator + ','.join(
+                TRACE_EVENT % (quoted[section], (start - origin) / 1000, (end - start) / 1000, thread + 1)
+                for section, thread, start, end in batch
+            ))
+            separator = ','
+        f.write(']}')
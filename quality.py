@@ -0,0 +1,79 @@
+from array import array
+
+DOWNGRADE_LOAD = 0.9  # Mean busy share of the budget that steps quality down
+UPGRADE_LOAD = 0.6  # Mean busy share of the budget that steps quality back up
+RETRY_WINDOWS = 4  # Windows to wait before retrying a level that ran over budget
+MAX_RETRY_WINDOWS = 64  # Cap on that wait, which doubles every time the level fails again
+
+
+class QualityGovernor:
+    """
+    Adaptive quality control for a frame budget.
+    Quality is a list of levels ordered from best to cheapest. The busy
+    time of every frame (work, not waiting for the frame cap) goes into a
+    moving window; when the window's mean runs over DOWNGRADE_LOAD of the
+    budget the governor steps one level down, and when it drops under
+    UPGRADE_LOAD it steps one level back up. After a change the window
+    starts over, so every decision is based on frames at the new level.
+    Levels that ran over budget are remembered: the governor waits
+    RETRY_WINDOWS windows before stepping back up to one, twice as long
+    after each further failure there, so a load that sits between the
+    two thresholds of adjacent levels does not flip between them every
+    window.
+    """
+    def __init__(self, levels, budget, window=60):
+        """Govern levels (a list of setting dicts) for a frame budget in seconds"""
+        self.levels = levels
+        self.budget = budget
+        self.window = window
+        self.samples = array('d', bytes(8 * window))
+        self.filled = 0
+        self.total = 0.0
+        self.level = 0
+        self.changes = 0
+        self.frames = 0
+        self.failures = [0] * len(levels)  # Times each level ran over budget
+        self.retry_at = [0] * len(levels)  # Frame from which each level may be tried again
+
+    @property
+    def settings(self):
+        """Return the settings of the current level"""
+        return self.levels[self.level]
+
+    def record(self, busy):
+        """
+        Add one frame's busy time in seconds. Return True if the level
+        changed, after which the caller should apply settings.
+        """
+        slot = self.filled % self.window
+        self.total += busy - self.samples[slot]
+        self.samples[slot] = busy
+        self.filled += 1
+        self.frames += 1
+        if self.filled < self.window:
+            return False
+
+        load = self.total / self.window / self.budget
+        level = self.level
+        if load > DOWNGRADE_LOAD and level < len(self.levels) - 1:
+            self.failures[level] += 1
+            wait = min(RETRY_WINDOWS << (self.failures[level] - 1), MAX_RETRY_WINDOWS)
+            self.retry_at[level] = self.frames + wait * self.window
+            return self.set_level(level + 1)
+        if load < UPGRADE_LOAD and level > 0 and self.frames >= self.retry_at[level - 1]:
+            return self.set_level(level - 1)
+        return False
+
+    def set_level(self, level):
+        """Switch to a level and start a fresh window; return True"""
+        self.level = level
+        self.changes += 1
+        self.filled = 0
+        self.total = 0.0
+        for slot in range(self.window):
+            self.samples[slot] = 0.0
+        return True
+
+    def describe(self):
+        """Return a short description of the current level for overlays"""
+        return f"{self.level}/{len(self.levels) - 1} {self.settings['name']}"
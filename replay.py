@@ -0,0 +1,218 @@
+"""
+Compact input recording and deterministic playback for all three games.
+A replay stores the RNG seed, one packed input record per frame and a
+digest of the final game state, so playing it back headless doubles as
+a benchmark and a behaviour regression test.
+
+    python replay.py record asteroids run.rpl --seed 7
+    python replay.py play run.rpl
+"""
+import argparse
+import importlib
+import random
+import struct
+import sys
+import time
+import zlib
+
+import pygame
+
+from headless import InputFrame, KeyState, LiveInput, ScriptedInput
+
+GAMES = {
+    'asteroids': ('Asteroids', 'Game'),
+    'ocean': ('Ocean', 'OceanGame'),
+    'shooter': ('Shooter', 'Game')
+}
+
+# Every key any of the games reads; a key's index is its bit in the held mask
+KEYS = (
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s,
+    pygame.K_r, pygame.K_SPACE,
+    pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4
+)
+KEY_INDEX = {key: index for index, key in enumerate(KEYS)}
+
+MAGIC = b'PGRP'
+VERSION = 1
+# magic, version, fps, seed, frame count, game name length
+HEADER = struct.Struct('<4sBHQIB')
+# held-key mask, mouse x, mouse y, number of key presses that follow as key indices
+FRAME = struct.Struct('<HhhB')
+DIGEST = struct.Struct('<I')
+
+
+def state_digest(game):
+    """Return a CRC of the game state a replay is expected to reproduce"""
+    state = []
+    for name in ('score', 'depth', 'wave', 'game_over', 'enemy_count'):
+        value = getattr(game, name, None)
+        # Shooter's game_over is a method, not a flag
+        state.append(None if callable(value) else value)
+    for name in ('player', 'diver'):
+        actor = getattr(game, name, None)
+        if actor is not None:
+            state += [actor.x, actor.y, getattr(actor, 'health', None),
+                      getattr(actor, 'oxygen', None), getattr(actor, 'total_coins', None)]
+    return zlib.crc32(repr(state).encode())
+
+
+class RecordingInput:
+    """
+    Input source that wraps another one and records every frame it produces.
+    The game sees the recorded (quantized) frame, and time advances one
+    frame per advance(), exactly as it will on playback.
+    """
+    def __init__(self, source=None, fps=60):
+        """Wrap source (the live devices by default)"""
+        self.source = source or LiveInput()
+        self.fps = fps
+        self.frame = 0
+        self.records = bytearray()
+        self.current = InputFrame(frozenset(), (), (0, 0))
+        self.keys = KeyState(self.current.held)
+        self.key_downs = ()
+
+    @property
+    def finished(self):
+        """Recording never runs out on its own"""
+        return False
+
+    @property
+    def endless(self):
+        """Recording has no end of its own"""
+        return True
+
+    def advance(self, events):
+        """Read the next frame from the wrapped source and record it"""
+        self.source.advance(events)
+        pressed = self.source.get_pressed()
+        held = frozenset(key for key in KEYS if pressed[key])
+        downs = tuple(key for key in self.source.key_downs if key in KEY_INDEX)
+        mouse = tuple(self.source.get_mouse_pos())
+        self.current = InputFrame(held, downs, mouse)
+        self.keys = KeyState(held)
+        self.key_downs = downs
+        self.frame += 1
+
+        mask = 0
+        for key in held:
+            mask |= 1 << KEY_INDEX[key]
+        self.records += FRAME.pack(mask, mouse[0], mouse[1], len(downs))
+        self.records += bytes(KEY_INDEX[key] for key in downs)
+
+    def get_pressed(self):
+        """Return the held-key state of the current frame"""
+        return self.keys
+
+    def get_mouse_pos(self):
+        """Return the mouse position of the current frame"""
+        return self.current.mouse
+
+    def get_ticks(self):
+        """Return simulated milliseconds, one frame at a time"""
+        return self.frame * 1000 // self.fps
+
+    def save(self, path, game_name, seed, digest):
+        """Write the replay file"""
+        name = game_name.encode()
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.fps, seed, self.frame, len(name)))
+            f.write(name)
+            f.write(DIGEST.pack(digest))
+            f.write(zlib.compress(bytes(self.records), 9))
+
+
+class Replay:
+    """A loaded replay file"""
+    def __init__(self, game_name, seed, fps, frames, digest):
+        """Hold the decoded replay"""
+        self.game_name = game_name
+        self.seed = seed
+        self.fps = fps
+        self.frames = frames
+        self.digest = digest
+
+    @classmethod
+    def load(cls, path):
+        """Read and decode a replay file"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, fps, seed, count, name_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        offset = HEADER.size
+        game_name = data[offset:offset + name_length].decode()
+        offset += name_length
+        digest, = DIGEST.unpack_from(data, offset)
+        records = zlib.decompress(data[offset + DIGEST.size:])
+
+        frames = []
+        offset = 0
+        for _ in range(count):
+            mask, x, y, down_count = FRAME.unpack_from(records, offset)
+            offset += FRAME.size
+            held = frozenset(key for index, key in enumerate(KEYS) if mask >> index & 1)
+            downs = tuple(KEYS[index] for index in records[offset:offset + down_count])
+            offset += down_count
+            frames.append(InputFrame(held, downs, (x, y)))
+        return cls(game_name, seed, fps, frames, digest)
+
+    def input(self):
+        """Return a scripted input source playing this replay"""
+        return ScriptedInput(self.frames, self.fps)
+
+
+def create_game(game_name, seed, **kwargs):
+    """Seed the RNG and construct one of the games"""
+    module_name, class_name = GAMES[game_name]
+    module = importlib.import_module(module_name)
+    random.seed(seed)
+    return getattr(module, class_name)(**kwargs)
+
+
+def record(game_name, path, seed):
+    """Play a game live and save the session as a replay"""
+    recorder = RecordingInput()
+    game = create_game(game_name, seed, input_source=recorder)
+    game.run()
+    recorder.save(path, game_name, seed, state_digest(game))
+    print(f"recorded {recorder.frame} frames to {path}")
+
+
+def play(path):
+    """Re-run a replay headless at full speed; return True if the final state matches"""
+    replay = Replay.load(path)
+    game = create_game(replay.game_name, replay.seed, headless=True, input_source=replay.input(),
+                       step_rate=replay.fps)
+    start = time.perf_counter()
+    game.run()
+    elapsed = time.perf_counter() - start
+    digest = state_digest(game)
+    frames = game.loop.steps
+    print(f"{replay.game_name}: {frames} of {len(replay.frames)} frames in {elapsed:.3f}s ({frames / max(elapsed, 1e-9):,.0f} frames/s)")
+    print("final state matches" if digest == replay.digest else
+          f"final state MISMATCH: {digest:08x} != {replay.digest:08x}")
+    return digest == replay.digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="play live and record")
+    record_parser.add_argument('game', choices=list(GAMES))
+    record_parser.add_argument('path')
+    record_parser.add_argument('--seed', type=int, default=0)
+    play_parser = commands.add_parser('play', help="replay headless and verify")
+    play_parser.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.game, args.path, args.seed)
+    elif not play(args.path):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+class SpatialHash:
+    """
+    Uniform-grid broad phase for circle-shaped objects.
+    Objects are bucketed by the cell containing their centre, so the grid
+    is meant to be cleared and rebuilt once per frame.
+    """
+    def __init__(self, cell_size=64):
+        """Create an empty grid with square cells of the given size"""
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        """Remove every object from the grid"""
+        self.cells.clear()
+
+    def cell_of(self, x, y):
+        """Return the (column, row) key of the cell containing a point"""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, obj, x, y):
+        """Add an object to the cell containing (x, y)"""
+        key = self.cell_of(x, y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [obj]
+        else:
+            bucket.append(obj)
+
+    def rebuild(self, objects):
+        """Clear the grid and insert every object at its current x/y"""
+        self.cells.clear()
+        for obj in objects:
+            self.insert(obj, obj.x, obj.y)
+
+    def query(self, x, y, radius):
+        """
+        Yield every object bucketed in a cell overlapping the square
+        of half-width radius around (x, y). Callers do the exact test.
+        """
+        size = self.cell_size
+        cells = self.cells
+        min_col = int((x - radius) // size)
+        max_col = int((x + radius) // size)
+        min_row = int((y - radius) // size)
+        max_row = int((y + radius) // size)
+        for col in range(min_col, max_col + 1):
+            for row in range(min_row, max_row + 1):
+                bucket = cells.get((col, row))
+                if bucket:
+                    yield from bucket
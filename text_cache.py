@@ -0,0 +1,108 @@
+from collections import OrderedDict
+
+import pygame
+
+DIGITS = "0123456789-"
+
+
+class DigitAtlas:
+    """
+    Pre-rendered glyphs for the characters of a number in one font and color.
+    Changing numbers are composed from these instead of re-rasterized.
+    """
+    def __init__(self, font, color, antialias=True):
+        """Render every digit glyph once"""
+        self.glyphs = {char: font.render(char, antialias, color) for char in DIGITS}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def width(self, text):
+        """Return the width of a number string"""
+        return sum(self.glyphs[char].get_width() for char in text)
+
+    def draw(self, screen, text, pos):
+        """Blit a number string glyph by glyph and return the x after it"""
+        x, y = pos
+        for char in text:
+            glyph = self.glyphs[char]
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+
+class TextCache:
+    """
+    Cache of rendered text surfaces with bounded LRU eviction.
+    Surfaces are keyed by font, string, color and antialiasing, fonts by
+    name and size, and numbers are drawn from per-font digit atlases
+    straight to the screen, so changing values never enter the cache.
+    Create one per game after pygame.init(), since fonts die with pygame.quit().
+    """
+    def __init__(self, max_entries=128):
+        """Create an empty cache holding at most max_entries text surfaces"""
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.fonts = {}
+        self.atlases = {}
+
+    def font(self, size, name=None):
+        """Return a shared pygame font, loading it on first use"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, font, text, color, antialias=True):
+        """Return the rendered surface for a string, rendering only on a miss"""
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def atlas(self, font, color, antialias=True):
+        """Return the digit atlas for a font and color"""
+        key = (font, color, antialias)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = DigitAtlas(font, color, antialias)
+            self.atlases[key] = atlas
+        return atlas
+
+    def number_rect(self, font, label, value, color, pos, suffix=""):
+        """Return the rect draw_number would cover for label + value + suffix at pos"""
+        label_surface = self.render(font, label, color)
+        atlas = self.atlas(font, color)
+        width = label_surface.get_width() + atlas.width(str(int(value)))
+        height = max(label_surface.get_height(), atlas.height)
+        if suffix:
+            suffix_surface = self.render(font, suffix, color)
+            width += suffix_surface.get_width()
+            height = max(height, suffix_surface.get_height())
+        return pygame.Rect(pos, (width, height))
+
+    def draw_number(self, screen, font, label, value, color, pos, suffix=""):
+        """
+        Blit label + value + suffix at pos, e.g. "Score: " 120 "m", and
+        return the rect covered. The label and suffix come from the cache
+        and the value is drawn glyph by glyph from the digit atlas, so a
+        changing number neither renders nor caches a new surface.
+        """
+        x, y = pos
+        label_surface = self.render(font, label, color)
+        screen.blit(label_surface, pos)
+        atlas = self.atlas(font, color)
+        right = atlas.draw(screen, str(int(value)), (x + label_surface.get_width(), y))
+        height = max(label_surface.get_height(), atlas.height)
+        if suffix:
+            suffix_surface = self.render(font, suffix, color)
+            screen.blit(suffix_surface, (right, y))
+            right += suffix_surface.get_width()
+            height = max(height, suffix_surface.get_height())
+        return pygame.Rect(x, y, right - x, height)